@@ -1,31 +1,90 @@
 import os
+import re
+import glob
 import json
+import copy
 import platform
 import subprocess
 import requests
 import threading
 import zipfile
 import shutil
+import tempfile
 import traceback
 import time
 import hashlib
+import uuid
+import lzma
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from tkinter import *
 from tkinter import ttk, messagebox, simpledialog, filedialog
 from tkinter.font import Font
-from tqdm import tqdm
 from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from PIL import Image, ImageTk
 import webbrowser
 
 
+# 也在进程池中运行，需定义在模块级
+def _sha1_file(path):
+    """计算文件的SHA-1"""
+    # 文件无法读取时返回None
+    sha1 = hashlib.sha1()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha1.update(block)
+    except OSError:
+        return None
+    return sha1.hexdigest()
+
+
 class MinecraftBlueLauncher:
+    # 镜像源名称与基础URL
+    MIRROR_URLS = {
+        "BMCLAPI": "https://bmclapi2.bangbang93.com",
+        "MCBBS": "https://download.mcbbs.net",
+        "官方源": "https://launchermeta.mojang.com"
+    }
+
+    # 官方源使用的全部域名
+    OFFICIAL_HOSTS = {
+        "launchermeta.mojang.com",
+        "launcher.mojang.com",
+        "piston-meta.mojang.com",
+        "piston-data.mojang.com",
+        "libraries.minecraft.net",
+        "resources.download.minecraft.net"
+    }
+
+    # 官方Java运行时清单
+    JAVA_RUNTIME_MANIFEST = "https://launchermeta.mojang.com/v1/products/java-runtime/2ec0cc96c44e5a76b9c8b7c39df7210883d12871/all.json"
+
+    # 可选的JVM配置
+    JVM_PROFILES = ["自动", "默认", "G1低延迟", "Aikar", "ZGC", "Shenandoah"]
+
+    # 启动计划缓存格式版本，启动计划结构变化时递增
+    LAUNCH_PLAN_FORMAT = 1
+
     def __init__(self, root):
         self.root = root
         self.setup_window()
         self.load_assets()
         self.init_paths()
         self.load_config()
+        self.version_data_cache = {}  # 合并继承关系后的版本信息
+        self.file_index = None  # 游戏目录文件索引，首次使用时加载
+        self.file_index_lock = threading.Lock()
+        self.hash_cache = None  # 文件SHA-1缓存，首次深度校验时加载
+        self.hash_cache_lock = threading.Lock()
+        self.java_index = None  # Java运行时索引，首次使用时加载
+        self.java_index_lock = threading.Lock()
+        self.prefetch_cancel = threading.Event()  # 取消当前的预读任务
+        self.init_download_engine()
 
         # 初始化动画相关属性
         self.animations_running = True
@@ -35,9 +94,13 @@ class MinecraftBlueLauncher:
 
         self.setup_ui()
         self.refresh_local_versions()
+        self.select_last_version()
         self.running_process = None
         self.start_background_animation()
         self.setup_system_encoding()
+        self.schedule_mirror_probe()
+        threading.Thread(target=self.refresh_java_index, daemon=True).start()
+        self.root.after(500, self.resume_interrupted_installs)
 
     def setup_window(self):
         """配置主窗口属性"""
@@ -200,7 +263,8 @@ class MinecraftBlueLauncher:
             'assets/objects',
             'logs',
             'crash-reports',
-            'mods'  # 新增mods目录
+            'mods',  # 新增mods目录
+            'cache/meta'  # 版本元数据缓存
         ]
 
         for dir_name in required_dirs:
@@ -209,6 +273,7 @@ class MinecraftBlueLauncher:
         # 配置文件路径
         self.config_path = os.path.join(self.minecraft_dir, 'launcher_config.json')
         self.log_file = os.path.join(self.minecraft_dir, 'launcher.log')
+        self.cache_dir = os.path.join(self.minecraft_dir, 'cache')
 
     def load_config(self):
         """加载配置文件"""
@@ -222,7 +287,21 @@ class MinecraftBlueLauncher:
             'window_height': 700,
             'last_version': '',
             'fabric_version': '',  # 新增Fabric版本配置
-            'forge_version': ''  # 新增Forge版本配置
+            'forge_version': '',  # 新增Forge版本配置
+            'download_threads': 16,  # 并发下载线程数
+            'download_threads_per_host': 8,  # 单个主机的最大并发连接数
+            'mirror_scores': {},  # 镜像源测速结果
+            'mirror_probe_interval': 86400,  # 镜像源测速结果有效期(秒)
+            'meta_cache_ttl': 600,  # 版本清单缓存有效期(秒)
+            'hedge_enabled': True,  # 下载源响应慢时向备用镜像源发起对冲请求
+            'hedge_delay': 2.0,  # 等待首个响应多久后发起对冲请求(秒)
+            'min_throughput': 32768,  # 低于该速度(字节/秒)时放弃当前下载源，0为不限制
+            'download_segments': 4,  # 大文件分段并行下载的段数
+            'segment_threshold': 8 * 1024 * 1024,  # 超过该大小(字节)的文件使用分段下载
+            'jvm_profile': '自动',  # JVM配置，自动时根据Java版本、分配内存和物理内存选择
+            'appcds_enabled': True,  # 为每个版本生成类数据共享(AppCDS)归档以加快启动，需要Java 13及以上
+            'managed_java': True,  # 找不到版本所需的Java时自动下载官方Java运行时
+            'prefetch_enabled': True  # 选中版本时在后台预读其JAR和原生库，加快冷启动
         }
 
         try:
@@ -244,24 +323,166 @@ class MinecraftBlueLauncher:
             # 保存窗口尺寸
             self.config['window_width'] = self.root.winfo_width()
             self.config['window_height'] = self.root.winfo_height()
+            self.config['mirror'] = self.mirror_combobox.get()
+            self.config['jvm_profile'] = self.jvm_profile_combobox.get()
 
             with open(self.config_path, 'w', encoding='utf-8') as f:
                 json.dump(self.config, f, indent=2, ensure_ascii=False)
         except Exception as e:
             self.log(f"保存配置失败: {e}", "error")
 
+    def init_download_engine(self):
+        """初始化并发下载引擎"""
+        try:
+            self.download_workers = max(1, int(self.config['download_threads']))
+        except (TypeError, ValueError):
+            self.download_workers = 16
+
+        self.download_executor = ThreadPoolExecutor(
+            max_workers=self.download_workers,
+            thread_name_prefix="download"
+        )
+        self.host_semaphores = {}
+        self.host_semaphores_lock = threading.Lock()
+        self.mirror_scores_lock = threading.Lock()
+
+        # 下载进度统计，由状态栏定时读取
+        self.progress = {
+            'active': False,
+            'total': 0,
+            'done': 0,
+            'skipped': 0,
+            'files_total': 0,
+            'files_done': 0,
+            'host_bytes': {}
+        }
+        self.progress_lock = threading.Lock()
+        self.progress_samples = deque(maxlen=20)
+        self.host_rates = {}
+
+        # 对冲请求使用独立线程池，避免占满下载线程导致互相等待
+        self.hedge_executor = ThreadPoolExecutor(
+            max_workers=self.download_workers * 2,
+            thread_name_prefix="hedge"
+        )
+        self.hedge_stats = {'hedged': 0, 'hedge_wins': 0, 'primary_wins': 0, 'slow_aborts': 0}
+        self.hedge_stats_lock = threading.Lock()
+        self.init_http_session()
+
+    def init_http_session(self):
+        """初始化HTTP会话"""
+        try:
+            per_host = max(1, int(self.config['download_threads_per_host']))
+        except (TypeError, ValueError):
+            per_host = 8
+
+        # 统一超时：(连接超时, 读取超时)
+        self.http_timeout = (10, 30)
+
+        retry = Retry(
+            total=3,
+            connect=3,
+            read=2,
+            status=3,
+            backoff_factor=1,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False
+        )
+        # 每个主机一个连接池，池大小与下载并发数匹配，避免连接被丢弃重建
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=max(per_host, self.download_workers),
+            max_retries=retry
+        )
+
+        self.http = requests.Session()
+        self.http.headers['User-Agent'] = "EasyMinecraftLauncher/1.0"
+        self.http.mount('https://', adapter)
+        self.http.mount('http://', adapter)
+
+    def get_host_semaphore(self, url):
+        """获取限制单个主机并发数的信号量"""
+        host = urlparse(url).netloc
+        with self.host_semaphores_lock:
+            if host not in self.host_semaphores:
+                try:
+                    limit = max(1, int(self.config['download_threads_per_host']))
+                except (TypeError, ValueError):
+                    limit = 8
+                self.host_semaphores[host] = threading.BoundedSemaphore(limit)
+            return self.host_semaphores[host]
+
+    def _run_download_job(self, job):
+        """在下载线程中执行单个下载任务"""
+        try:
+            with self.get_host_semaphore(job['url']):
+                sha1 = job.get('sha1')
+                for sha1_url in job.get('sha1_urls') or []:
+                    if sha1:
+                        break
+                    sha1 = self.fetch_maven_sha1(sha1_url)
+                downloaded = self.download_file(
+                    job['url'],
+                    job['path'],
+                    sha1,
+                    job.get('size'),
+                    job.get('fallback_urls')
+                )
+            if not downloaded:
+                # 文件已存在且有效，直接计入已完成
+                self.skip_progress(job.get('size') or 0)
+        finally:
+            # 下载失败的文件也计入已处理，保证进度能够走完
+            self.finish_progress_file()
+        return job
+
+    def run_download_jobs(self, jobs, desc="文件"):
+        """并发执行下载任务"""
+        # jobs可以是生成器，返回失败任务列表 [(job, error), ...]
+        if isinstance(jobs, list):
+            self.begin_progress(sum(job.get('size') or 0 for job in jobs), len(jobs))
+
+        # 限制同时排队的任务数，避免一次性为大量任务创建Future
+        window = self.download_workers * 4
+        pending = set()
+        failures = []
+        finished = 0
+
+        def collect(done):
+            nonlocal finished
+            for future in done:
+                finished += 1
+                job = future.job
+                error = future.exception()
+                if error is not None:
+                    failures.append((job, error))
+
+        for job in jobs:
+            future = self.download_executor.submit(self._run_download_job, job)
+            future.job = job
+            pending.add(future)
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+
+        if pending:
+            done, _ = wait(pending)
+            collect(done)
+
+        self.end_progress()
+        self.log(f"{desc}下载完成: 成功 {finished - len(failures)} 个，失败 {len(failures)} 个",
+                 "success" if not failures else "warning")
+        self.report_host_rates()
+        self.report_hedge_stats()
+        return failures
+
     def detect_java(self):
         """自动检测Java路径"""
-        try:
-            # 尝试通过which/where命令查找
-            java_path = subprocess.check_output(
-                ['where' if platform.system() == 'Windows' else 'which', 'java'],
-                stderr=subprocess.DEVNULL
-            ).decode('utf-8', errors='ignore').strip()
-            if java_path and os.path.exists(java_path):
-                return java_path
-        except:
-            pass
+        # 在PATH中查找（不启动子进程）
+        java_path = shutil.which('java')
+        if java_path:
+            return java_path
 
         # 常见Java安装路径
         common_paths = [
@@ -408,6 +629,7 @@ class MinecraftBlueLauncher:
             relief="solid"
         )
         self.version_listbox.pack(side=LEFT, fill=BOTH, expand=True)
+        self.version_listbox.bind("<<ListboxSelect>>", self.on_version_selected)
 
         scrollbar = ttk.Scrollbar(
             version_frame,
@@ -511,13 +733,26 @@ class MinecraftBlueLauncher:
         self.memory_entry.grid(row=1, column=1, sticky=EW, pady=2)
         self.memory_entry.insert(0, self.config['memory'])
 
+        ttk.Label(java_frame, text="JVM配置:").grid(row=2, column=0, sticky=W, pady=2)
+        self.jvm_profile_combobox = ttk.Combobox(
+            java_frame,
+            values=self.JVM_PROFILES,
+            state="readonly"
+        )
+        self.jvm_profile_combobox.grid(row=2, column=1, sticky=EW, pady=2)
+        self.jvm_profile_combobox.set(self.config['jvm_profile'])
+        self.jvm_profile_combobox.bind(
+            "<<ComboboxSelected>>",
+            lambda e: self.config.update(jvm_profile=self.jvm_profile_combobox.get())
+        )
+
         # Java验证标签
         self.java_status_label = ttk.Label(
             java_frame,
             text="",
             style="Status.TLabel"
         )
-        self.java_status_label.grid(row=2, column=0, columnspan=3, sticky=W)
+        self.java_status_label.grid(row=3, column=0, columnspan=3, sticky=W)
 
         # 初始验证Java
         self.verify_java()
@@ -530,11 +765,20 @@ class MinecraftBlueLauncher:
         ttk.Label(download_frame, text="镜像源:").grid(row=0, column=0, sticky=W, pady=2)
         self.mirror_combobox = ttk.Combobox(
             download_frame,
-            values=["BMCLAPI", "MCBBS", "官方源"],
+            values=["自动", "BMCLAPI", "MCBBS", "官方源"],
             state="readonly"
         )
         self.mirror_combobox.grid(row=0, column=1, sticky=EW, pady=2)
         self.mirror_combobox.set(self.config['mirror'])
+        self.mirror_combobox.bind("<<ComboboxSelected>>", lambda e: self.schedule_mirror_probe())
+
+        ttk.Button(
+            download_frame,
+            text="测速",
+            command=lambda: self.schedule_mirror_probe(force=True),
+            width=6,
+            style="Accent.TButton"
+        ).grid(row=0, column=2, padx=(5, 0))
 
         ttk.Label(download_frame, text="版本号:").grid(row=1, column=0, sticky=W, pady=2)
 
@@ -573,6 +817,14 @@ class MinecraftBlueLauncher:
         )
         self.launch_btn.pack(side=LEFT, padx=(0, 5), fill=X, expand=True)
 
+        self.verify_btn = ttk.Button(
+            button_frame,
+            text="深度校验",
+            command=self.deep_verify_version,
+            style="Accent.TButton"
+        )
+        self.verify_btn.pack(side=LEFT, padx=(0, 5), fill=X, expand=True)
+
         self.refresh_btn = ttk.Button(
             button_frame,
             text="刷新列表",
@@ -633,8 +885,26 @@ class MinecraftBlueLauncher:
         )
         self.memory_usage_label.pack(side=RIGHT, padx=5)
 
+        # 下载进度
+        self.progress_bar = ttk.Progressbar(
+            status_frame,
+            orient=HORIZONTAL,
+            length=200,
+            mode='determinate',
+            maximum=1000
+        )
+        self.progress_bar.pack(side=RIGHT, padx=5)
+
+        self.progress_label = ttk.Label(
+            status_frame,
+            text="",
+            style="Status.TLabel"
+        )
+        self.progress_label.pack(side=RIGHT, padx=5)
+
         # 更新内存使用信息
         self.update_memory_usage()
+        self.update_progress_display()
 
     def update_memory_usage(self):
         """更新内存使用信息"""
@@ -649,6 +919,90 @@ class MinecraftBlueLauncher:
 
         self.root.after(5000, self.update_memory_usage)
 
+    def update_progress_display(self):
+        """刷新下载进度"""
+        with self.progress_lock:
+            # host_bytes 会被下载线程修改，需要在锁内复制
+            progress = {**self.progress, 'host_bytes': dict(self.progress['host_bytes'])}
+
+        if progress['active']:
+            now = time.perf_counter()
+            samples = self.progress_samples
+            samples.append((now, progress['done'] - progress['skipped'], progress['host_bytes']))
+
+            # 以最近几秒的采样计算滑动平均速度
+            first_time, first_done, first_hosts = samples[0]
+            elapsed = max(now - first_time, 0.001)
+            speed = (progress['done'] - progress['skipped'] - first_done) / elapsed
+            self.host_rates = {
+                host: (total - first_hosts.get(host, 0)) / elapsed
+                for host, total in progress['host_bytes'].items()
+            }
+
+            total = progress['total']
+            done = min(progress['done'], total) if total else progress['done']
+            text = f"{progress['files_done']}/{progress['files_total']} 个文件"
+            if total:
+                self.progress_bar.config(value=done * 1000 // total)
+                text += f"  {done / 1024 / 1024:.1f}/{total / 1024 / 1024:.1f}MB"
+            text += f"  {speed / 1024 / 1024:.2f}MB/s"
+            if total and speed > 0:
+                eta = int((total - done) / speed)
+                text += f"  剩余 {eta // 60:02d}:{eta % 60:02d}"
+            self.progress_label.config(text=text)
+        elif self.progress_label.cget('text'):
+            self.progress_bar.config(value=0)
+            self.progress_label.config(text="")
+
+        self.root.after(250, self.update_progress_display)
+
+    def begin_progress(self, total_bytes, total_files):
+        """开始统计一批下载的进度"""
+        with self.progress_lock:
+            self.progress = {
+                'active': True,
+                'total': total_bytes,
+                'done': 0,
+                'skipped': 0,
+                'files_total': total_files,
+                'files_done': 0,
+                'host_bytes': {}
+            }
+        self.progress_samples = deque(maxlen=20)
+        self.host_rates = {}
+
+    def add_progress(self, host, nbytes):
+        """计入实际下载的字节数"""
+        with self.progress_lock:
+            self.progress['done'] += nbytes
+            host_bytes = self.progress['host_bytes']
+            host_bytes[host] = host_bytes.get(host, 0) + nbytes
+
+    def skip_progress(self, nbytes):
+        """计入跳过的字节数"""
+        # 已存在或续传前已有的部分不参与速度计算
+        with self.progress_lock:
+            self.progress['done'] += nbytes
+            self.progress['skipped'] += nbytes
+
+    def finish_progress_file(self):
+        """计入一个已完成的文件"""
+        with self.progress_lock:
+            self.progress['files_done'] += 1
+
+    def end_progress(self):
+        """结束下载进度统计"""
+        with self.progress_lock:
+            self.progress['active'] = False
+
+    def report_host_rates(self):
+        """输出各下载源的最近速度"""
+        rates = sorted(self.host_rates.items(), key=lambda item: item[1], reverse=True)
+        if rates:
+            self.log("各下载源速度: " + "，".join(
+                f"{host} {rate / 1024 / 1024:.2f}MB/s" for host, rate in rates[:5]
+            ))
+
     def verify_java(self):
         """验证Java安装"""
         java_path = self.java_entry.get().strip()
@@ -657,22 +1011,15 @@ class MinecraftBlueLauncher:
             return False
 
         try:
-            # 检查Java版本
-            result = subprocess.run(
-                [java_path, "-version"],
-                stderr=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                timeout=5
-            )
-
-            output = result.stderr or result.stdout
-            if "version" not in output.lower():
+            # 检查Java版本（结果来自Java运行时索引，文件未变化时不会再启动Java）
+            info = self.get_java_info(java_path)
+            if not info['major']:
                 raise ValueError("无效的Java输出")
 
-            self.java_status_label.config(text="Java验证通过", style="Status.TLabel")
+            self.java_status_label.config(
+                text=f"Java验证通过: {info['version']} ({info['vendor'] or '未知发行版'}, {info['arch'] or '未知架构'})",
+                style="Status.TLabel"
+            )
             return True
         except Exception as e:
             self.java_status_label.config(
@@ -715,20 +1062,134 @@ class MinecraftBlueLauncher:
         if not os.path.exists(versions_dir):
             return
 
+        self.refresh_file_index([versions_dir])
+
         versions = []
-        for version in os.listdir(versions_dir):
+        for version in self.list_indexed_dirs(versions_dir):
+            if search_term not in version.lower():
+                continue
+
             version_dir = os.path.join(versions_dir, version)
-            if os.path.isdir(version_dir):
-                json_path = os.path.join(version_dir, f"{version}.json")
-                jar_path = os.path.join(version_dir, f"{version}.jar")
-                if os.path.exists(json_path) and os.path.exists(jar_path):
-                    if search_term in version.lower():
-                        versions.append(version)
+            json_path = os.path.join(version_dir, f"{version}.json")
+            jar_path = os.path.join(version_dir, f"{version}.jar")
+            if self.get_indexed_size(json_path) is None or not self.has_client_jar(version, jar_path):
+                continue
+
+            # 只有存在安装日志时才需要读取
+            if self.get_indexed_size(self.get_install_journal_path(version)) is None or \
+                    self.is_version_complete(version):
+                versions.append(version)
 
         versions.sort(reverse=True)
         for version in versions:
             self.version_listbox.insert(END, version)
 
+    def has_client_jar(self, version, jar_path):
+        """检查客户端JAR"""
+        if self.get_indexed_size(jar_path) is not None:
+            return True
+
+        try:
+            jar_version = self.load_version_data(version).get('jar', version)
+        except Exception:
+            return False
+        return self.get_indexed_size(
+            os.path.join(self.minecraft_dir, 'versions', jar_version, f"{jar_version}.jar")
+        ) is not None
+
+    def select_last_version(self):
+        """选中上次启动的版本"""
+        last_version = self.config.get('last_version')
+        if last_version in self.version_listbox.get(0, END):
+            index = self.version_listbox.get(0, END).index(last_version)
+            self.version_listbox.selection_set(index)
+            self.version_listbox.see(index)
+            self.start_prefetch(last_version)
+
+    def on_version_selected(self, event=None):
+        """选中版本时预读"""
+        selection = self.version_listbox.curselection()
+        if selection:
+            self.start_prefetch(self.version_listbox.get(selection[0]))
+
+    def start_prefetch(self, version):
+        """开始预读版本"""
+        if not self.config.get('prefetch_enabled', True):
+            return
+
+        self.prefetch_cancel.set()
+        self.prefetch_cancel = threading.Event()
+        threading.Thread(
+            target=self._prefetch_thread,
+            args=(version, self.prefetch_cancel),
+            daemon=True
+        ).start()
+
+    def get_prefetch_files(self, version):
+        """获取预读文件"""
+        plan, _ = self.load_launch_plan(version)
+        files = list(plan['classpath'])
+
+        for dirpath, _, filenames in os.walk(plan['natives_dir']):
+            files.extend(os.path.join(dirpath, name) for name in filenames)
+
+        asset_index = self.load_version_data(version).get('assetIndex', {}).get('id')
+        if asset_index:
+            files.append(os.path.join(self.minecraft_dir, 'assets', 'indexes', f"{asset_index}.json"))
+        return files
+
+    def set_low_io_priority(self):
+        """降低I/O优先级"""
+        try:
+            if platform.system() == "Windows":
+                import ctypes
+                # THREAD_MODE_BACKGROUND_BEGIN: 同时降低当前线程的CPU、I/O和内存优先级
+                kernel32 = ctypes.windll.kernel32
+                kernel32.SetThreadPriority(kernel32.GetCurrentThread(), 0x00010000)
+            elif platform.system() == "Linux":
+                import psutil
+                # Linux的I/O优先级按线程设置，使用线程ID
+                psutil.Process(threading.get_native_id()).ionice(psutil.IOPRIO_CLASS_IDLE)
+        except Exception:
+            pass
+
+    def _prefetch_thread(self, version, cancel):
+        """预读的线程"""
+        try:
+            self.set_low_io_priority()
+            start = time.perf_counter()
+            files = self.get_prefetch_files(version)
+
+            warmed_files = 0
+            warmed_bytes = 0
+            for path in files:
+                if cancel.is_set():
+                    return
+                try:
+                    if hasattr(os, 'posix_fadvise'):
+                        fd = os.open(path, os.O_RDONLY)
+                        try:
+                            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                            warmed_bytes += os.fstat(fd).st_size
+                        finally:
+                            os.close(fd)
+                    else:
+                        with open(path, 'rb') as f:
+                            for block in iter(lambda: f.read(1024 * 1024), b''):
+                                warmed_bytes += len(block)
+                                if cancel.is_set():
+                                    return
+                    warmed_files += 1
+                except OSError:
+                    continue
+
+            self.log(
+                f"已预读 {version}: {warmed_files} 个文件，"
+                f"{warmed_bytes / 1024 / 1024:.1f}MB，耗时 {time.perf_counter() - start:.2f}s"
+            )
+        except Exception as e:
+            self.log(f"预读 {version} 失败: {str(e)}", "warning")
+
     def refresh_local_versions(self):
         """刷新本地版本列表"""
         self.search_var.set("")
@@ -742,10 +1203,7 @@ class MinecraftBlueLauncher:
 
         try:
             self.log(f"获取版本列表从: {manifest_url}")
-            response = requests.get(manifest_url, timeout=10)
-            response.raise_for_status()
-
-            manifest = response.json()
+            manifest = self.fetch_json_cached(manifest_url)
             versions = [v['id'] for v in manifest['versions']]
 
             # 显示版本选择对话框
@@ -840,11 +1298,216 @@ class MinecraftBlueLauncher:
     def get_mirror_url(self):
         """获取当前镜像源URL"""
         mirror_name = self.mirror_combobox.get()
-        return {
-            "BMCLAPI": "https://bmclapi2.bangbang93.com",
-            "MCBBS": "https://download.mcbbs.net",
-            "官方源": "https://launchermeta.mojang.com"
-        }.get(mirror_name, "https://launchermeta.mojang.com")
+        if mirror_name == "自动":
+            mirror_name = self.get_best_mirror()
+        return self.MIRROR_URLS.get(mirror_name, "https://launchermeta.mojang.com")
+
+    def get_best_mirror(self):
+        """选择最快的镜像源"""
+        with self.mirror_scores_lock:
+            scores = {
+                name: info['score']
+                for name, info in self.config['mirror_scores'].items()
+                if name in self.MIRROR_URLS and 'score' in info
+            }
+        if not scores:
+            return "BMCLAPI"
+        return min(scores, key=scores.get)
+
+    def mirror_for_url(self, url):
+        """获取URL的镜像源"""
+        host = urlparse(url).netloc
+        if host in self.OFFICIAL_HOSTS:
+            return "官方源"
+        for name, base_url in self.MIRROR_URLS.items():
+            if urlparse(base_url).netloc == host:
+                return name
+        return None
+
+    def record_mirror_sample(self, mirror_name, latency, throughput):
+        """记录镜像源测速"""
+        alpha = 0.3
+        with self.mirror_scores_lock:
+            info = self.config['mirror_scores'].setdefault(mirror_name, {})
+            if 'latency' in info:
+                info['latency'] = (1 - alpha) * info['latency'] + alpha * latency
+                info['throughput'] = (1 - alpha) * info['throughput'] + alpha * throughput
+            else:
+                info['latency'] = latency
+                info['throughput'] = throughput
+            # 评分为下载1MB文件的预计耗时（秒），越小越好
+            info['score'] = info['latency'] + 1024 * 1024 / max(info['throughput'], 1)
+            info['updated'] = time.time()
+
+    def get_alternate_url(self, url):
+        """获取备用镜像源URL"""
+        parsed = urlparse(url)
+        current = self.mirror_for_url(url)
+        if current is None:
+            return None
+
+        # 统一转换为镜像源上的路径
+        path = parsed.path
+        if parsed.netloc == "libraries.minecraft.net":
+            path = f"/maven{path}"
+        elif parsed.netloc == "resources.download.minecraft.net":
+            path = f"/assets{path}"
+
+        with self.mirror_scores_lock:
+            scores = {
+                name: info.get('score', float('inf'))
+                for name, info in self.config['mirror_scores'].items()
+            }
+        # 未测速（评分相同）时优先使用官方源
+        candidates = sorted(
+            (name for name in self.MIRROR_URLS if name != current),
+            key=lambda name: (scores.get(name, float('inf')), name != "官方源")
+        )
+        if not candidates:
+            return None
+
+        name = candidates[0]
+        if name == "官方源":
+            return self.get_official_url(path)
+        return f"{self.MIRROR_URLS[name]}{path}"
+
+    def get_official_url(self, path):
+        """获取官方源URL"""
+        if path.startswith("/maven/"):
+            return f"https://libraries.minecraft.net{path[len('/maven'):]}"
+        if path.startswith("/assets/"):
+            return f"https://resources.download.minecraft.net{path[len('/assets'):]}"
+        if path.startswith("/v1/objects/"):
+            # 客户端JAR、Java运行时文件等
+            return f"https://piston-data.mojang.com{path}"
+        if path.startswith("/v1/packages/"):
+            return f"https://piston-meta.mojang.com{path}"
+        if path.startswith("/mc/game/") or path.startswith("/v1/products/"):
+            return f"https://launchermeta.mojang.com{path}"
+        return None
+
+    def _open_stream(self, url, headers):
+        """发起流式请求"""
+        return self.http.get(url, stream=True, timeout=self.http_timeout, headers=headers)
+
+    def open_download(self, source, headers, hedge_headers):
+        """打开下载连接"""
+        # 返回 (响应对象, 实际使用的URL)
+        alternate = self.get_alternate_url(source) if self.config['hedge_enabled'] else None
+        if alternate is None:
+            return self._open_stream(source, headers), source
+
+        primary = self.hedge_executor.submit(self._open_stream, source, headers)
+        done, _ = wait([primary], timeout=self.config['hedge_delay'])
+        if done:
+            return primary.result(), source
+
+        hedge = self.hedge_executor.submit(self._open_stream, alternate, hedge_headers)
+        urls = {primary: source, hedge: alternate}
+        with self.hedge_stats_lock:
+            self.hedge_stats['hedged'] += 1
+
+        pending = {primary, hedge}
+        winner = None
+        last_error = None
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    last_error = future.exception()
+                elif winner is None:
+                    winner = future
+                else:
+                    future.result().close()
+
+        # 关闭落败一方的连接（请求无法中途取消，等其返回后再关闭）
+        for future in pending:
+            future.add_done_callback(
+                lambda f: f.result().close() if f.exception() is None else None
+            )
+
+        if winner is None:
+            raise last_error
+
+        with self.hedge_stats_lock:
+            self.hedge_stats['hedge_wins' if winner is hedge else 'primary_wins'] += 1
+        return winner.result(), urls[winner]
+
+    def report_hedge_stats(self):
+        """输出对冲请求统计"""
+        with self.hedge_stats_lock:
+            stats = dict(self.hedge_stats)
+        if stats['hedged'] or stats['slow_aborts']:
+            self.log(
+                f"对冲请求: 触发 {stats['hedged']} 次，备用源胜出 {stats['hedge_wins']} 次，"
+                f"原下载源胜出 {stats['primary_wins']} 次，因速度过低切换 {stats['slow_aborts']} 次"
+            )
+
+    def probe_mirror(self, mirror_name, base_url):
+        """测量单个镜像源的延迟和吞吐量"""
+        probe_url = f"{base_url}/mc/game/version_manifest.json"
+        start = time.perf_counter()
+        try:
+            response = self.http.get(
+                probe_url,
+                stream=True,
+                timeout=self.http_timeout,
+                headers={'Cache-Control': 'no-cache'}
+            )
+            response.raise_for_status()
+            latency = time.perf_counter() - start
+
+            received = 0
+            body_start = time.perf_counter()
+            for chunk in response.iter_content(chunk_size=65536):
+                received += len(chunk)
+                if received >= 256 * 1024:
+                    break
+            response.close()
+
+            throughput = received / max(time.perf_counter() - body_start, 0.001)
+            self.record_mirror_sample(mirror_name, latency, throughput)
+            return latency, throughput
+        except Exception as e:
+            # 不可用的镜像源按超时计入，避免被自动选中
+            self.record_mirror_sample(mirror_name, self.http_timeout[0], 1024)
+            self.log(f"镜像源 {mirror_name} 测速失败: {str(e)}", "warning")
+            return None
+
+    def probe_mirrors(self):
+        """并行测速所有镜像源"""
+        self.log("正在测试镜像源速度...")
+        with ThreadPoolExecutor(max_workers=len(self.MIRROR_URLS)) as executor:
+            results = dict(zip(
+                self.MIRROR_URLS,
+                executor.map(lambda item: self.probe_mirror(*item), self.MIRROR_URLS.items())
+            ))
+
+        for name, result in results.items():
+            if result:
+                latency, throughput = result
+                self.log(f"镜像源 {name}: 延迟 {latency * 1000:.0f}ms，速度 {throughput / 1024:.0f}KB/s")
+        self.log(f"当前最快镜像源: {self.get_best_mirror()}", "success")
+
+        # 在主线程中保存测速结果
+        self.root.after(0, self.save_config)
+
+    def schedule_mirror_probe(self, force=False):
+        """后台测速镜像源"""
+        if not force:
+            if self.mirror_combobox.get() != "自动":
+                return
+            with self.mirror_scores_lock:
+                updated = [
+                    info.get('updated', 0)
+                    for name, info in self.config['mirror_scores'].items()
+                    if name in self.MIRROR_URLS
+                ]
+            if len(updated) == len(self.MIRROR_URLS) and \
+                    time.time() - min(updated) < self.config['mirror_probe_interval']:
+                return
+
+        threading.Thread(target=self.probe_mirrors, daemon=True).start()
 
     def download_version(self):
         """下载游戏版本"""
@@ -859,10 +1522,24 @@ class MinecraftBlueLauncher:
 
         mirror_url = self.get_mirror_url()
 
+        # 输入多个版本号（逗号或空格分隔）时批量安装
+        versions = list(dict.fromkeys(version.replace('，', ',').replace(',', ' ').split()))
+        if not versions:
+            messagebox.showerror("错误", "请输入要下载的版本号")
+            return
+
+        if len(versions) > 1:
+            threading.Thread(
+                target=self._batch_download_thread,
+                args=(versions, mirror_url),
+                daemon=True
+            ).start()
+            return
+
         # 在新线程中下载
         threading.Thread(
             target=self._download_version_thread,
-            args=(version, mirror_url),
+            args=(versions[0], mirror_url),
             daemon=True
         ).start()
 
@@ -875,126 +1552,29 @@ class MinecraftBlueLauncher:
             # 禁用按钮防止重复操作
             self.toggle_buttons(False)
 
-            # 1. 获取版本清单
-            self.log("获取版本清单...")
-            manifest_url = f"{mirror_url}/mc/game/version_manifest.json"
-            manifest = self.http_get(manifest_url).json()
-
-            # 2. 查找指定版本
-            version_info = None
-            for v in manifest['versions']:
-                if v['id'] == version:
-                    version_url = v['url'].replace(
-                        "https://launchermeta.mojang.com",
-                        mirror_url
-                    )
-                    self.log(f"获取版本信息: {version_url}")
-                    version_info = self.http_get(version_url).json()
-                    break
-
+            # 1. 获取版本信息
+            version_info = self.resolve_version_info(version, mirror_url)
             if not version_info:
                 self.log(f"错误: 找不到版本 {version}", "error")
                 messagebox.showerror("错误", f"找不到版本 {version}")
                 return
 
-            # 3. 创建版本目录
-            version_dir = os.path.join(self.minecraft_dir, 'versions', version)
-            os.makedirs(version_dir, exist_ok=True)
-
-            # 4. 保存版本json
-            json_path = os.path.join(version_dir, f"{version}.json")
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(version_info, f, indent=2, ensure_ascii=False)
-            self.log(f"版本信息已保存: {json_path}")
-
-            # 5. 下载客户端JAR
-            client_url = version_info['downloads']['client']['url']
-            client_url = client_url.replace(
-                "https://launcher.mojang.com",
-                mirror_url
-            )
-            jar_path = os.path.join(version_dir, f"{version}.jar")
-            self.log(f"下载客户端: {client_url}")
-            self.download_file(client_url, jar_path)
-
-            # 6. 下载资源索引
-            assets_url = version_info['assetIndex']['url']
-            assets_url = assets_url.replace(
-                "https://launchermeta.mojang.com",
-                mirror_url
-            )
-            assets_index_path = os.path.join(
-                self.minecraft_dir,
-                'assets',
-                'indexes',
-                f"{version_info['assets']}.json"
-            )
-            self.log(f"下载资源索引: {assets_url}")
-            self.download_file(assets_url, assets_index_path)
-
-            # 7. 下载依赖库
-            self.log("开始下载依赖库...")
-            libraries_dir = os.path.join(self.minecraft_dir, 'libraries')
-            os.makedirs(libraries_dir, exist_ok=True)
-
-            for lib in version_info['libraries']:
-                if 'rules' in lib and not self.check_library_rules(lib['rules']):
-                    continue
+            # 2. 保存版本信息、下载资源索引并生成安装计划
+            plan, done_steps = self.prepare_version_install(version, version_info, mirror_url)
 
-                # 确保下载主库文件
-                if 'downloads' in lib and 'artifact' in lib['downloads']:
-                    lib_url = lib['downloads']['artifact']['url'].replace(
-                        "https://libraries.minecraft.net",
-                        f"{mirror_url}/maven"
-                    )
-                    lib_path = os.path.join(
-                        self.minecraft_dir,
-                        'libraries',
-                        lib['downloads']['artifact']['path']
-                    )
+            # 3. 对比本地文件，并发下载缺失的客户端、依赖库、原生库和资源文件
+            if 'files' not in done_steps:
+                missing = self.diff_install_plan(plan, check_hash=True)
+                self.log_install_plan(plan, missing)
 
-                    if not os.path.exists(lib_path):
-                        try:
-                            self.download_file(lib_url, lib_path)
-                        except Exception as e:
-                            self.log(f"下载库失败: {lib_url} - {str(e)}", "error")
-                            continue
-
-            # 8. 下载原生库
-            self.log("处理原生库...")
-            natives_dir = os.path.join(version_dir, 'natives')
-            if os.path.exists(natives_dir):
-                shutil.rmtree(natives_dir)
-            os.makedirs(natives_dir)
-
-            for lib in version_info['libraries']:
-                if 'natives' in lib:
-                    platform_key = {
-                        "windows": "natives-windows",
-                        "darwin": "natives-macos",
-                        "linux": "natives-linux"
-                    }.get(platform.system().lower())
-
-                    if platform_key and platform_key in lib['natives']:
-                        classifier = lib['natives'][platform_key].replace("${arch}", platform.machine())
-                        if 'classifiers' in lib['downloads'] and classifier in lib['downloads']['classifiers']:
-                            native_url = lib['downloads']['classifiers'][classifier]['url']
-                            native_url = native_url.replace(
-                                "https://libraries.minecraft.net",
-                                f"{mirror_url}/maven"
-                            )
-                            native_path = os.path.join(natives_dir, os.path.basename(native_url))
-                            self.log(f"下载原生库: {native_url}")
-                            try:
-                                self.download_file(native_url, native_path)
-
-                                # 解压原生库
-                                with zipfile.ZipFile(native_path, 'r') as zip_ref:
-                                    zip_ref.extractall(natives_dir)
-                                os.remove(native_path)
-                            except Exception as e:
-                                self.log(f"下载原生库失败: {str(e)}", "error")
+                failures = self.run_download_jobs(missing, "游戏文件")
+                self.log_download_failures(failures)
+                if failures:
+                    raise Exception(f"{len(failures)} 个文件下载失败，可重新下载以继续安装")
+                self.update_install_journal(version, step='files')
 
+            # 4. 解压原生库并标记安装完成
+            self.finish_version_install(version, plan)
             self.log(f"版本 {version} 下载完成!", "success")
             messagebox.showinfo("成功", f"版本 {version} 下载完成!")
             self.refresh_local_versions()
@@ -1008,171 +1588,1005 @@ class MinecraftBlueLauncher:
             self.set_status("就绪")
             self.toggle_buttons(True)
 
-    def http_get(self, url, max_retries=3, timeout=30):
-        """带重试的HTTP请求"""
-        for i in range(max_retries):
-            try:
-                # 确保URL正确处理镜像源
-                parsed = urlparse(url)
-                if "launchermeta.mojang.com" in parsed.netloc:
-                    mirror_url = self.get_mirror_url()
-                    url = url.replace("https://launchermeta.mojang.com", mirror_url)
-                elif "libraries.minecraft.net" in parsed.netloc:
-                    mirror_url = self.get_mirror_url()
-                    url = url.replace("https://libraries.minecraft.net", f"{mirror_url}/maven")
-
-                response = requests.get(url, timeout=timeout)
-                response.raise_for_status()
-                return response
-            except requests.exceptions.RequestException as e:
-                if i == max_retries - 1:
-                    raise
-                wait_time = (i + 1) * 2  # 指数退避
-                time.sleep(wait_time)
-                self.log(f"请求失败，重试 {i + 1}/{max_retries} (等待 {wait_time}秒): {str(e)}", "warning")
-
-    def download_file(self, url, path):
-        """下载文件并显示进度"""
-        mirror_url = self.get_mirror_url()
-        download_sources = [
-            url,
-            url.replace("https://launchermeta.mojang.com", mirror_url),
-            url.replace("https://libraries.minecraft.net", f"{mirror_url}/maven"),
-            url.replace("https://launcher.mojang.com", mirror_url)
-        ]
-
-        last_error = None
-        for source in download_sources:
-            try:
-                response = requests.get(source, stream=True, timeout=60)
-                response.raise_for_status()
+    def _batch_download_thread(self, versions, mirror_url):
+        """批量下载的线程"""
+        try:
+            self.set_status(f"正在批量下载 {len(versions)} 个版本...")
+            self.log(f"开始批量下载: {', '.join(versions)}，使用镜像源: {mirror_url}")
 
-                total_size = int(response.headers.get('content-length', 0))
-                os.makedirs(os.path.dirname(path), exist_ok=True)
-
-                with open(path, 'wb') as f, tqdm(
-                        total=total_size,
-                        unit='B',
-                        unit_scale=True,
-                        desc=os.path.basename(path),
-                        miniters=1
-                ) as bar:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            bar.update(len(chunk))
-                return  # 下载成功则返回
+            # 禁用按钮防止重复操作
+            self.toggle_buttons(False)
 
-            except Exception as e:
-                last_error = e
-                continue
+            # 1. 获取各版本信息并生成安装计划
+            plans = {}
+            for version in versions:
+                version_info = self.resolve_version_info(version, mirror_url)
+                if not version_info:
+                    self.log(f"错误: 找不到版本 {version}，已跳过", "error")
+                    continue
+                plans[version], _ = self.prepare_version_install(version, version_info, mirror_url)
 
-        # 所有源都失败
-        raise Exception(f"所有下载源尝试失败: {str(last_error)}")
+            if not plans:
+                messagebox.showerror("错误", "没有可下载的版本")
+                return
 
-    def check_library_rules(self, rules):
-        """检查库规则是否适用当前系统"""
-        if not rules:
-            return True
+            # 2. 合并安装计划，按目标路径去重
+            merged = {}
+            for plan in plans.values():
+                for action in plan['actions']:
+                    merged.setdefault(action['path'], action)
+            merged_plan = {'version': ', '.join(plans), 'actions': list(merged.values())}
+            shared = sum(len(plan['actions']) for plan in plans.values()) - len(merged)
+            self.log(f"合并后共 {len(merged)} 个文件，其中 {shared} 个为多个版本共用")
+
+            # 3. 一次性并发下载所有缺失文件
+            missing = self.diff_install_plan(merged_plan, check_hash=True)
+            self.log_install_plan(merged_plan, missing)
+            failures = self.run_download_jobs(missing, "批量")
+            self.log_download_failures(failures)
+            failed_paths = {job['path'] for job, _ in failures}
+
+            # 4. 文件全部就绪的版本才标记为安装完成
+            completed = []
+            for version, plan in plans.items():
+                if any(action['path'] in failed_paths for action in plan['actions']):
+                    self.log(f"版本 {version} 有文件下载失败，可重新下载以继续安装", "error")
+                    continue
+                self.update_install_journal(version, step='files')
+                self.finish_version_install(version, plan)
+                completed.append(version)
 
-        system_name = platform.system().lower()
-        system_arch = platform.machine().lower()
+            self.log(f"批量下载完成: {len(completed)}/{len(versions)} 个版本", "success")
+            messagebox.showinfo("完成", f"已安装 {len(completed)}/{len(versions)} 个版本:\n{', '.join(completed)}")
+            self.refresh_local_versions()
 
-        allow = False
-        for rule in rules:
-            if rule['action'] == 'allow':
-                if 'os' in rule:
-                    if rule['os']['name'] != system_name:
-                        return False
-                    allow = True
-                else:
-                    allow = True
-            elif rule['action'] == 'disallow':
-                if 'os' in rule:
-                    if rule['os']['name'] == system_name:
-                        return False
+        except Exception as e:
+            error_msg = str(e)
+            self.log(f"批量下载失败: {error_msg}", "error")
+            self.log(traceback.format_exc(), "error")
+            messagebox.showerror("错误", f"批量下载失败:\n{error_msg}")
+        finally:
+            self.set_status("就绪")
+            self.toggle_buttons(True)
 
-        return allow
+    def resolve_version_info(self, version, mirror_url):
+        """获取版本JSON"""
+        self.log("获取版本清单...")
+        manifest_url = f"{mirror_url}/mc/game/version_manifest.json"
+        manifest = self.fetch_json_cached(manifest_url)
+
+        for v in manifest['versions']:
+            if v['id'] == version:
+                version_url = self.rewrite_to_mirror(v['url'], mirror_url)
+                self.log(f"获取版本信息: {version_url}")
+                # 版本JSON的URL中包含其SHA-1，内容不会变化，可一直使用缓存
+                immutable = v.get('sha1') and v['sha1'] in version_url
+                return self.fetch_json_cached(
+                    version_url,
+                    ttl=float('inf') if immutable else None
+                )
+        return None
 
-    def launch_game(self):
-        """启动游戏"""
-        selection = self.version_listbox.curselection()
-        if not selection:
-            messagebox.showerror("错误", "请选择要启动的版本")
-            return
+    def prepare_version_install(self, version, version_info, mirror_url):
+        """准备安装版本"""
+        # 返回 (安装计划, 之前已完成的步骤)
+        # 创建版本目录并开始记录安装日志
+        version_dir = os.path.join(self.minecraft_dir, 'versions', version)
+        os.makedirs(version_dir, exist_ok=True)
+        done_steps = self.begin_install_journal(version, mirror_url)
+        if done_steps:
+            self.log(f"继续未完成的安装，已完成步骤: {', '.join(done_steps)}")
+
+        # 保存版本json
+        json_path = os.path.join(version_dir, f"{version}.json")
+        self.write_json_atomic(json_path, version_info)
+        self.log(f"版本信息已保存: {json_path}")
+        self.update_install_journal(version, step='metadata')
+
+        # 下载资源索引（资源文件列表依赖它）
+        self.download_plan_action(self.get_asset_index_action(version_info, mirror_url))
+        self.update_install_journal(version, step='asset_index')
+
+        return self.build_install_plan(version, version_info, mirror_url), done_steps
+
+    def finish_version_install(self, version, plan):
+        """完成版本安装"""
+        self.log("处理原生库...")
+        self.extract_natives(version, plan)
+        self.update_install_journal(version, step='natives')
+        self.update_install_journal(version, status='complete')
+
+    def log_download_failures(self, failures):
+        """输出下载失败的文件"""
+        for job, error in failures[:10]:
+            self.log(f"下载失败: {job['url']} - {str(error)}", "error")
+        if len(failures) > 10:
+            self.log(f"另有 {len(failures) - 10} 个文件下载失败", "error")
+
+    def get_install_journal_path(self, version):
+        """获取版本安装日志文件路径"""
+        return os.path.join(self.minecraft_dir, 'versions', version, '.install.json')
+
+    def begin_install_journal(self, version, mirror_url):
+        """开始安装日志"""
+        journal = self.read_json_file(self.get_install_journal_path(version))
+        if not journal or journal.get('status') != 'in_progress':
+            journal = {
+                'version': version,
+                'status': 'in_progress',
+                'steps': [],
+                'started': time.time()
+            }
+        journal['mirror_url'] = mirror_url
+        journal['updated'] = time.time()
+        self.write_json_atomic(self.get_install_journal_path(version), journal)
+        return journal['steps']
+
+    def update_install_journal(self, version, step=None, status=None):
+        """记录已完成的安装步骤或安装状态"""
+        path = self.get_install_journal_path(version)
+        journal = self.read_json_file(path) or {'version': version, 'status': 'in_progress', 'steps': []}
+        if step and step not in journal['steps']:
+            journal['steps'].append(step)
+        if status:
+            journal['status'] = status
+        journal['updated'] = time.time()
+        self.write_json_atomic(path, journal)
+
+    def is_version_complete(self, version):
+        """检查版本是否完整"""
+        journal = self.read_json_file(self.get_install_journal_path(version))
+        return journal is None or journal.get('status') != 'in_progress'
+
+    def resume_interrupted_installs(self):
+        """继续中断的安装"""
+        versions_dir = os.path.join(self.minecraft_dir, 'versions')
+        interrupted = []
+        for version in os.listdir(versions_dir):
+            journal = self.read_json_file(self.get_install_journal_path(version))
+            if journal and journal.get('status') == 'in_progress':
+                interrupted.append((version, journal.get('mirror_url') or self.get_mirror_url()))
 
-        version = self.version_listbox.get(selection[0])
-        username = self.username_entry.get().strip()
-        if not username:
-            messagebox.showerror("错误", "请输入用户名")
+        if not interrupted:
             return
 
-        if not self.verify_java():
-            messagebox.showerror("错误", "请先验证Java路径是否正确")
+        names = ", ".join(version for version, _ in interrupted)
+        self.log(f"检测到未完成的安装: {names}", "warning")
+        if not messagebox.askyesno("继续安装", f"检测到未完成的安装:\n{names}\n\n是否继续安装？"):
             return
 
-        # 在新线程中启动游戏
-        threading.Thread(
-            target=self._launch_game_thread,
-            args=(version, username),
-            daemon=True
-        ).start()
-
-    def _launch_game_thread(self, version, username):
-        """启动游戏的线程"""
-        try:
-            self.set_status(f"正在启动 {version}...")
-            self.log(f"准备启动版本 {version}...")
-
-            # 禁用按钮防止重复操作
-            self.toggle_buttons(False)
-
-            # 1. 加载版本信息
-            version_dir = os.path.join(self.minecraft_dir, 'versions', version)
-            json_path = os.path.join(version_dir, f"{version}.json")
+        def resume_all():
+            for version, mirror_url in interrupted:
+                self._download_version_thread(version, mirror_url)
+
+        threading.Thread(target=resume_all, daemon=True).start()
+
+    def get_assets_url(self, mirror_url):
+        """获取资源文件下载地址"""
+        if mirror_url == "https://launchermeta.mojang.com":
+            return "https://resources.download.minecraft.net"
+        return f"{mirror_url}/assets"
+
+    def rewrite_to_mirror(self, url, mirror_url):
+        """把官方下载地址改写到指定镜像源"""
+        if mirror_url == "https://launchermeta.mojang.com":
+            return url
+
+        parsed = urlparse(url)
+        if parsed.netloc == "libraries.minecraft.net":
+            return f"{mirror_url}/maven{parsed.path}"
+        if parsed.netloc == "resources.download.minecraft.net":
+            return f"{mirror_url}/assets{parsed.path}"
+        if parsed.netloc in self.OFFICIAL_HOSTS:
+            return f"{mirror_url}{parsed.path}"
+        return url
+
+    def get_native_classifier(self, lib):
+        """获取原生库分类"""
+        if 'natives' not in lib:
+            return None
 
-            with open(json_path, 'r', encoding='utf-8') as f:
-                version_data = json.load(f)
+        # 版本JSON中natives的键为系统名，值为classifier名
+        platform_key = {
+            "windows": "windows",
+            "darwin": "osx",
+            "linux": "linux"
+        }.get(platform.system().lower())
 
-            # 2. 验证文件完整性
-            missing_files = self.verify_game_files(version, version_data)
-            if missing_files:
-                self.log(f"缺失文件: {', '.join(missing_files)}", "error")
-                if not messagebox.askyesno("错误", "游戏文件不完整，是否尝试修复？"):
-                    return
+        if not platform_key or platform_key not in lib['natives']:
+            return None
 
-                # 尝试重新下载缺失文件
-                self.repair_game_files(version, version_data, missing_files)
+        arch_bits = platform.architecture()[0][:2]
+        classifier = lib['natives'][platform_key].replace("${arch}", arch_bits)
+        if classifier not in lib.get('downloads', {}).get('classifiers', {}):
+            return None
+        return classifier
+
+    def maven_coord_to_path(self, name):
+        """Maven坐标转路径"""
+        extension = 'jar'
+        if '@' in name:
+            name, extension = name.split('@', 1)
+
+        parts = name.split(':')
+        group, artifact, version = parts[:3]
+        classifier = f"-{parts[3]}" if len(parts) > 3 else ""
+        return f"{group.replace('.', '/')}/{artifact}/{version}/{artifact}-{version}{classifier}.{extension}"
+
+    def get_library_path(self, lib):
+        """获取库文件路径"""
+        if 'downloads' in lib and 'artifact' in lib['downloads']:
+            return lib['downloads']['artifact'].get('path') or self.maven_coord_to_path(lib['name'])
+        if 'downloads' not in lib and 'name' in lib:
+            return self.maven_coord_to_path(lib['name'])
+        return None
+
+    def get_library_action(self, lib, mirror_url):
+        """生成库下载动作"""
+        libraries_dir = os.path.join(self.minecraft_dir, 'libraries')
 
-            # 3. 构建classpath
-            libraries = []
-            libraries_dir = os.path.join(self.minecraft_dir, 'libraries')
+        if 'downloads' in lib:
+            if 'artifact' not in lib['downloads']:
+                return None
+            artifact = lib['downloads']['artifact']
+            lib_path = self.get_library_path(lib)
+            lib_url = self.rewrite_to_mirror(artifact['url'], mirror_url)
+            return {
+                'kind': 'library',
+                'name': lib_path,
+                'url': lib_url,
+                'fallback_urls': self.get_fallback_urls(artifact['url'], lib_url),
+                'path': os.path.join(libraries_dir, lib_path),
+                'sha1': artifact.get('sha1'),
+                'size': artifact.get('size')
+            }
 
-            for lib in version_data['libraries']:
-                if 'rules' in lib and not self.check_library_rules(lib['rules']):
-                    continue
+        if 'name' not in lib:
+            return None
 
-                # 主库文件
-                if 'downloads' in lib and 'artifact' in lib['downloads']:
-                    lib_path = os.path.join(
-                        libraries_dir,
-                        lib['downloads']['artifact']['path']
-                    )
-                    if os.path.exists(lib_path):
-                        libraries.append(lib_path)
+        lib_path = self.maven_coord_to_path(lib['name'])
+        repository = lib.get('url', "https://libraries.minecraft.net/").rstrip('/')
+        original_url = f"{repository}/{lib_path}"
 
-            # 添加主JAR
-            main_jar = os.path.join(version_dir, f"{version}.jar")
-            classpath = os.pathsep.join([main_jar] + libraries)
+        # Fabric仓库改写到镜像源，镜像源失败时再用原始地址
+        if urlparse(repository).netloc == "maven.fabricmc.net" and \
+                mirror_url != "https://launchermeta.mojang.com":
+            lib_url = f"{mirror_url}/maven/{lib_path}"
+        else:
+            lib_url = self.rewrite_to_mirror(original_url, mirror_url)
 
-            # 4. 准备natives目录
-            natives_dir = os.path.join(version_dir, 'natives')
-            if not os.path.exists(natives_dir):
-                os.makedirs(natives_dir)
+        fallback_urls = [original_url] if lib_url != original_url else []
+        return {
+            'kind': 'library',
+            'name': lib_path,
+            'url': lib_url,
+            'path': os.path.join(libraries_dir, lib_path),
+            'sha1': lib.get('sha1'),
+            'size': lib.get('size'),
+            # 没有给出SHA-1时从仓库的 .sha1 文件获取
+            'sha1_urls': [] if lib.get('sha1') else [f"{u}.sha1" for u in [lib_url] + fallback_urls],
+            'fallback_urls': fallback_urls
+        }
 
-            # 5. 构建启动命令
-            java_path = self.java_entry.get().strip()
-            memory = self.memory_entry.get().strip()
+    def fetch_maven_sha1(self, sha1_url):
+        """获取Maven的SHA-1"""
+        try:
+            response = self.http.get(sha1_url, timeout=self.http_timeout)
+            response.raise_for_status()
+            sha1 = response.text.strip().split()[0].lower()
+            return sha1 if len(sha1) == 40 else None
+        except Exception:
+            return None
+
+    def get_asset_index_action(self, version_info, mirror_url):
+        """生成资源索引的下载动作"""
+        asset_index = version_info['assetIndex']
+        url = self.rewrite_to_mirror(asset_index['url'], mirror_url)
+        return {
+            'kind': 'asset_index',
+            'name': f"assets/indexes/{version_info['assets']}.json",
+            'url': url,
+            'fallback_urls': self.get_fallback_urls(asset_index['url'], url),
+            'path': os.path.join(
+                self.minecraft_dir,
+                'assets',
+                'indexes',
+                f"{version_info['assets']}.json"
+            ),
+            'sha1': asset_index.get('sha1'),
+            'size': asset_index.get('size')
+        }
+
+    def get_fallback_urls(self, original_url, url):
+        """获取官方备用地址"""
+        return [original_url] if original_url != url else []
+
+    def iter_asset_actions(self, assets_index_path, mirror_url):
+        """生成资源下载动作"""
+        assets_index = self.read_json_file(assets_index_path)
+        if not assets_index:
+            return
+
+        assets_url = self.get_assets_url(mirror_url)
+        objects_dir = os.path.join(self.minecraft_dir, 'assets', 'objects')
+        seen_hashes = set()
+
+        for obj in assets_index.get('objects', {}).values():
+            file_hash = obj['hash']
+            # 不同资源名可能指向同一个文件
+            if file_hash in seen_hashes:
+                continue
+            seen_hashes.add(file_hash)
+
+            url = f"{assets_url}/{file_hash[:2]}/{file_hash}"
+            yield {
+                'kind': 'asset',
+                'name': f"assets/objects/{file_hash[:2]}/{file_hash}",
+                'url': url,
+                'fallback_urls': self.get_fallback_urls(
+                    f"https://resources.download.minecraft.net/{file_hash[:2]}/{file_hash}", url
+                ),
+                'path': os.path.join(objects_dir, file_hash[:2], file_hash),
+                'sha1': file_hash,
+                'size': obj['size']
+            }
+
+    def build_install_plan(self, version, version_info, mirror_url):
+        """生成安装计划"""
+        actions = []
+        libraries_dir = os.path.join(self.minecraft_dir, 'libraries')
+
+        # 客户端JAR（继承自父版本时使用父版本的JAR）
+        jar_version = version_info.get('jar', version)
+        client = version_info['downloads']['client']
+        client_url = self.rewrite_to_mirror(client['url'], mirror_url)
+        actions.append({
+            'kind': 'client',
+            'name': f"{jar_version}.jar",
+            'url': client_url,
+            'fallback_urls': self.get_fallback_urls(client['url'], client_url),
+            'path': os.path.join(self.minecraft_dir, 'versions', jar_version, f"{jar_version}.jar"),
+            'sha1': client.get('sha1'),
+            'size': client.get('size')
+        })
+
+        # 资源索引
+        asset_index_action = self.get_asset_index_action(version_info, mirror_url)
+        actions.append(asset_index_action)
+
+        # 依赖库和原生库
+        for lib in version_info['libraries']:
+            if 'rules' in lib and not self.check_library_rules(lib['rules']):
+                continue
+
+            library_action = self.get_library_action(lib, mirror_url)
+            if library_action:
+                actions.append(library_action)
+
+            classifier = self.get_native_classifier(lib)
+            if classifier:
+                native = lib['downloads']['classifiers'][classifier]
+                native_url = self.rewrite_to_mirror(native['url'], mirror_url)
+                actions.append({
+                    'kind': 'native',
+                    'name': native['path'],
+                    'url': native_url,
+                    'fallback_urls': self.get_fallback_urls(native['url'], native_url),
+                    'path': os.path.join(libraries_dir, native['path']),
+                    'sha1': native.get('sha1'),
+                    'size': native.get('size'),
+                    'exclude': lib.get('extract', {}).get('exclude', [])
+                })
+
+        # 资源文件
+        actions.extend(self.iter_asset_actions(asset_index_action['path'], mirror_url))
+
+        return {'version': version, 'actions': actions}
+
+    def diff_install_plan(self, plan, check_hash=False):
+        """对比本地文件"""
+        self.refresh_file_index()
+
+        missing = []
+        for action in plan['actions']:
+            file_size = self.get_indexed_size(action['path'])
+            if file_size is None:
+                missing.append(action)
+                continue
+
+            if check_hash and action['kind'] != 'asset' and action['sha1']:
+                if self.is_file_valid(action['path'], action['sha1'], action['size']):
+                    continue
+                missing.append(action)
+                continue
+
+            if action['size'] is None or file_size == action['size']:
+                continue
+            missing.append(action)
+        return missing
+
+    def log_install_plan(self, plan, missing):
+        """输出安装计划的文件数和下载量"""
+        total_bytes = sum(action['size'] or 0 for action in plan['actions'])
+        missing_bytes = sum(action['size'] or 0 for action in missing)
+        self.log(
+            f"安装计划: 共 {len(plan['actions'])} 个文件 ({total_bytes / 1024 / 1024:.1f}MB)，"
+            f"需下载 {len(missing)} 个 ({missing_bytes / 1024 / 1024:.1f}MB)"
+        )
+
+    def download_plan_action(self, action):
+        """下载单个计划动作"""
+        self.download_file(action['url'], action['path'], action['sha1'], action['size'], action.get('fallback_urls'))
+
+    def extract_native_to_cache(self, jar_path, sha1, exclude):
+        """解压原生库到缓存"""
+        store_dir = os.path.join(self.cache_dir, 'natives', sha1)
+        if os.path.isdir(store_dir):
+            return store_dir
+
+        # 先解压到临时目录，完成后再重命名，避免留下不完整的缓存
+        tmp_dir = f"{store_dir}.tmp{threading.get_ident()}"
+        if os.path.exists(tmp_dir):
+            shutil.rmtree(tmp_dir)
+        os.makedirs(tmp_dir)
+
+        with zipfile.ZipFile(jar_path, 'r') as zip_ref:
+            for member in zip_ref.infolist():
+                name = member.filename
+                if member.is_dir() or any(name.startswith(prefix) for prefix in exclude):
+                    continue
+                # 忽略试图写到目录外的条目
+                if os.path.isabs(name) or '..' in name.replace('\\', '/').split('/'):
+                    continue
+                zip_ref.extract(member, tmp_dir)
+
+        try:
+            os.rename(tmp_dir, store_dir)
+        except OSError:
+            # 其他线程已完成同一个库的解压
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return store_dir
+
+    def link_file(self, source, target, allow_symlink=True):
+        """链接或复制文件"""
+        try:
+            os.link(source, target)
+            return
+        except OSError:
+            pass
+
+        if allow_symlink:
+            try:
+                os.symlink(source, target)
+                return
+            except OSError:
+                pass
+        shutil.copy2(source, target)
+
+    def extract_natives(self, version, plan):
+        """解压原生库"""
+        natives_dir = os.path.join(self.minecraft_dir, 'versions', version, 'natives')
+        if os.path.exists(natives_dir):
+            shutil.rmtree(natives_dir)
+        os.makedirs(natives_dir)
+
+        for action in plan['actions']:
+            if action['kind'] != 'native':
+                continue
+            try:
+                sha1 = action['sha1'] or _sha1_file(action['path'])
+                store_dir = self.extract_native_to_cache(action['path'], sha1, action['exclude'])
+
+                for dirpath, _, filenames in os.walk(store_dir):
+                    relative_dir = os.path.relpath(dirpath, store_dir)
+                    target_dir = os.path.normpath(os.path.join(natives_dir, relative_dir))
+                    os.makedirs(target_dir, exist_ok=True)
+                    for filename in filenames:
+                        target = os.path.join(target_dir, filename)
+                        if not os.path.exists(target):
+                            self.link_file(os.path.join(dirpath, filename), target)
+            except Exception as e:
+                self.log(f"解压原生库失败: {str(e)}", "error")
+
+    def is_file_valid(self, path, sha1=None, size=None):
+        """检查文件是否有效"""
+        if sha1 is None and size is None:
+            return False
+
+        try:
+            if size is not None and os.path.getsize(path) != size:
+                return False
+            if sha1 is not None:
+                return _sha1_file(path) == sha1.lower()
+            return True
+        except OSError:
+            return False
+
+    def get_file_index_path(self):
+        """获取文件索引的持久化路径"""
+        return os.path.join(self.cache_dir, 'file_index.json')
+
+    def refresh_file_index(self, roots=None):
+        """刷新文件索引"""
+        # 每个目录只stat一次，修改时间未变的目录沿用记录，变化的目录才重新列出
+        if roots is None:
+            roots = [os.path.join(self.minecraft_dir, name) for name in ('libraries', 'versions', 'assets')]
+        roots = [os.path.normpath(root) for root in roots]
+
+        with self.file_index_lock:
+            if self.file_index is None:
+                saved = self.read_json_file(self.get_file_index_path())
+                self.file_index = saved.get('dirs', {}) if isinstance(saved, dict) else {}
+
+            old_index = self.file_index
+            new_index = {
+                path: entry for path, entry in old_index.items()
+                if not any(path == root or path.startswith(root + os.sep) for root in roots)
+            }
+            changed = False
+
+            stack = list(roots)
+            while stack:
+                dir_path = stack.pop()
+                try:
+                    mtime = os.stat(dir_path).st_mtime_ns
+                except OSError:
+                    continue
+
+                entry = old_index.get(dir_path)
+                if not entry or entry['mtime'] != mtime:
+                    entry = self.scan_directory(dir_path, mtime)
+                    changed = True
+
+                new_index[dir_path] = entry
+                stack.extend(os.path.join(dir_path, name) for name in entry['dirs'])
+
+            changed = changed or len(new_index) != len(old_index)
+            self.file_index = new_index
+
+            if changed:
+                try:
+                    self.write_json_atomic(self.get_file_index_path(), {'dirs': new_index})
+                except OSError as e:
+                    self.log(f"保存文件索引失败: {str(e)}", "warning")
+
+    def scan_directory(self, dir_path, mtime):
+        """列出目录下的文件大小和子目录"""
+        files = {}
+        dirs = []
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            dirs.append(entry.name)
+                        elif entry.is_file():
+                            files[entry.name] = entry.stat().st_size
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+
+        # 修改时间在最近2秒内时，同一时间刻度内的后续修改无法通过mtime发现，下次仍需重新列出
+        if time.time_ns() - mtime < 2_000_000_000:
+            mtime = None
+        return {'mtime': mtime, 'files': files, 'dirs': dirs}
+
+    def get_indexed_size(self, path):
+        """查询文件大小"""
+        path = os.path.normpath(path)
+        entry = (self.file_index or {}).get(os.path.dirname(path))
+        if entry is None:
+            return None
+        return entry['files'].get(os.path.basename(path))
+
+    def list_indexed_dirs(self, dir_path):
+        """从文件索引中列出目录下的子目录"""
+        entry = (self.file_index or {}).get(os.path.normpath(dir_path))
+        return list(entry['dirs']) if entry else []
+
+    def read_json_file(self, path):
+        """读取JSON文件"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write_json_atomic(self, path, data):
+        """原子写入JSON"""
+        dir_path = os.path.dirname(path)
+        os.makedirs(dir_path, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=dir_path, prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def fetch_json_cached(self, url, ttl=None):
+        """获取JSON元数据"""
+        # 缓存以URL路径为键，各镜像源共用同一份缓存
+        if ttl is None:
+            ttl = self.config['meta_cache_ttl']
+
+        key = hashlib.sha1(urlparse(url).path.encode('utf-8')).hexdigest()
+        data_path = os.path.join(self.cache_dir, 'meta', f"{key}.json")
+        info_path = os.path.join(self.cache_dir, 'meta', f"{key}.info.json")
+
+        info = self.read_json_file(info_path)
+        cached = self.read_json_file(data_path) if info else None
+
+        if cached is not None and time.time() - info.get('fetched', 0) < ttl:
+            return cached
+
+        headers = {}
+        if cached is not None:
+            if info.get('etag'):
+                headers['If-None-Match'] = info['etag']
+            if info.get('last_modified'):
+                headers['If-Modified-Since'] = info['last_modified']
+
+        try:
+            response = self.http.get(url, timeout=self.http_timeout, headers=headers)
+            if response.status_code == 304 and cached is not None:
+                info['fetched'] = time.time()
+                self.write_json_atomic(info_path, info)
+                return cached
+
+            response.raise_for_status()
+            data = response.json()
+            self.write_json_atomic(data_path, data)
+            self.write_json_atomic(info_path, {
+                'url': url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched': time.time()
+            })
+            return data
+        except Exception as e:
+            if cached is not None:
+                self.log(f"无法连接服务器，使用缓存的数据: {str(e)}", "warning")
+                return cached
+            raise
+
+    def remove_part_files(self, part_path):
+        """删除未完成的下载"""
+        for p in (part_path, f"{part_path}.json"):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+    def download_file(self, url, path, sha1=None, size=None, fallback_urls=None):
+        """下载文件并计入进度"""
+        # 返回是否实际下载；fallback_urls 在其他下载源都失败后使用
+        if self.is_file_valid(path, sha1, size):
+            return False
+
+        # 去掉重复的下载源，避免同一地址被重复请求（每次请求还会按重试策略多次重试）
+        download_sources = list(dict.fromkeys(
+            [url, self.rewrite_to_mirror(url, self.get_mirror_url())] + list(fallback_urls or [])
+        ))
+        # 当前源速度过低时可切换到备用镜像源继续下载
+        if self.config['hedge_enabled']:
+            alternate = self.get_alternate_url(download_sources[-1])
+            if alternate and alternate not in download_sources:
+                download_sources.append(alternate)
+        slow_hosts = set()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        part_path = f"{path}.part"
+        info_path = f"{part_path}.json"
+
+        # 大文件且没有可续传的 .part 文件时，尝试分段并行下载
+        if size and size >= self.config['segment_threshold'] and \
+                self.config['download_segments'] > 1 and not os.path.exists(part_path):
+            try:
+                self.download_segmented(list(dict.fromkeys(download_sources)), path, sha1, size)
+                return True
+            except Exception as e:
+                self.log(f"分段下载失败，改用单线程下载: {str(e)}", "warning")
+                self.remove_part_files(part_path)
+
+        # 本次已计入进度的字节数，续传时只补计之前未计入的部分
+        reported = 0
+        last_error = None
+        for source in download_sources:
+            if urlparse(source).netloc in slow_hosts:
+                continue
+            try:
+                # 判断已有的 .part 文件能否续传：同一URL，或SHA-1相同的其他镜像
+                offset = 0
+                headers = {}
+                part_info = self.read_json_file(info_path)
+                if part_info and os.path.exists(part_path) and (
+                        part_info.get('url') == source or
+                        (sha1 and part_info.get('sha1') == sha1)):
+                    offset = os.path.getsize(part_path)
+                    if offset:
+                        headers['Range'] = f"bytes={offset}-"
+                        if part_info.get('etag') and part_info.get('url') == source:
+                            headers['If-Range'] = part_info['etag']
+
+                # 只有SHA-1已知时，备用镜像源才能接着已有的 .part 文件续传
+                hedge_headers = {'Range': headers['Range']} if sha1 and 'Range' in headers else {}
+
+                request_start = time.perf_counter()
+                response, source = self.open_download(source, headers, hedge_headers)
+                latency = time.perf_counter() - request_start
+                if response.status_code == 416:
+                    # 已有数据超出服务器文件长度，说明记录已失效
+                    response.close()
+                    self.remove_part_files(part_path)
+                    raise Exception("续传范围无效，已清除未完成的文件")
+                response.raise_for_status()
+
+                content_length = int(response.headers.get('content-length', 0))
+                if offset and response.status_code == 206 and \
+                        response.headers.get('content-range', '').startswith(f"bytes {offset}-"):
+                    mode = 'ab'
+                else:
+                    # 服务器不支持续传或文件已变化，从头开始
+                    offset = 0
+                    mode = 'wb'
+
+                hasher = hashlib.sha1() if sha1 else None
+                if hasher and offset:
+                    with open(part_path, 'rb') as f:
+                        for block in iter(lambda: f.read(1024 * 1024), b''):
+                            hasher.update(block)
+
+                with open(info_path, 'w', encoding='utf-8') as f:
+                    json.dump({
+                        'url': source,
+                        'etag': response.headers.get('ETag'),
+                        'size': size if size is not None else (offset + content_length or None),
+                        'sha1': sha1
+                    }, f)
+
+                if offset > reported:
+                    self.skip_progress(offset - reported)
+                    reported = offset
+
+                host = urlparse(source).netloc
+                written = offset
+                body_start = time.perf_counter()
+                min_throughput = self.config['min_throughput']
+                next_check = offset + 1024 * 1024
+                with open(part_path, mode) as f:
+                    for chunk in response.iter_content(chunk_size=65536):
+                        if chunk:
+                            f.write(chunk)
+                            if hasher:
+                                hasher.update(chunk)
+                            written += len(chunk)
+
+                            # 每1MB汇报一次进度并检查速度，避免在每个数据块上加锁
+                            if written >= next_check:
+                                next_check = written + 1024 * 1024
+                                if written > reported:
+                                    self.add_progress(host, written - reported)
+                                    reported = written
+                                if not min_throughput:
+                                    continue
+                                # 速度过慢则放弃该源，由下一个源续传
+                                elapsed = time.perf_counter() - body_start
+                                if elapsed > 5 and (written - offset) / elapsed < min_throughput:
+                                    response.close()
+                                    slow_hosts.add(host)
+                                    with self.hedge_stats_lock:
+                                        self.hedge_stats['slow_aborts'] += 1
+                                    raise Exception(f"下载速度过低: {host}")
+
+                if written > reported:
+                    self.add_progress(host, written - reported)
+                    reported = written
+
+                if size is not None and written != size:
+                    self.remove_part_files(part_path)
+                    raise Exception(f"文件大小不匹配: 期望 {size}，实际 {written}")
+                if hasher and hasher.hexdigest() != sha1.lower():
+                    self.remove_part_files(part_path)
+                    raise Exception(f"SHA-1校验失败: {os.path.basename(path)}")
+
+                # 下载完成后原子替换目标文件
+                os.replace(part_path, path)
+                self.remove_part_files(part_path)
+
+                # 较大的文件才能反映真实吞吐量，用于更新镜像源评分
+                mirror_name = self.mirror_for_url(source)
+                if mirror_name and written - offset >= 64 * 1024:
+                    throughput = (written - offset) / max(time.perf_counter() - body_start, 0.001)
+                    self.record_mirror_sample(mirror_name, latency, throughput)
+                return True  # 下载成功则返回
+
+            except Exception as e:
+                # 网络中断时保留 .part 文件，下一个下载源从断点继续
+                last_error = e
+                continue
+
+        # 所有源都失败
+        raise Exception(f"所有下载源尝试失败: {str(last_error)}")
+
+    def download_segmented(self, sources, path, sha1, size):
+        """分段下载文件"""
+        part_path = f"{path}.part"
+        with open(part_path, 'wb') as f:
+            f.truncate(size)
+
+        segments = max(1, int(self.config['download_segments']))
+        segment_size = -(-size // segments)
+        ranges = [
+            (start, min(start + segment_size, size) - 1)
+            for start in range(0, size, segment_size)
+        ]
+
+        def fetch_segment(index, start, end):
+            last_error = None
+            # 分段失败时换下一个下载源重新下载该分段
+            for attempt in range(len(sources)):
+                source = sources[(index + attempt) % len(sources)]
+                try:
+                    response = self.http.get(
+                        source,
+                        stream=True,
+                        timeout=self.http_timeout,
+                        headers={'Range': f"bytes={start}-{end}"}
+                    )
+                    response.raise_for_status()
+                    if response.status_code != 206 or \
+                            not response.headers.get('content-range', '').startswith(f"bytes {start}-"):
+                        response.close()
+                        raise Exception(f"下载源不支持分段下载: {urlparse(source).netloc}")
+
+                    host = urlparse(source).netloc
+                    position = start
+                    reported = start
+                    with open(part_path, 'r+b') as f:
+                        f.seek(start)
+                        for chunk in response.iter_content(chunk_size=65536):
+                            if chunk:
+                                # 防止越界写入相邻分段
+                                chunk = chunk[:end + 1 - position]
+                                f.write(chunk)
+                                position += len(chunk)
+                                if position - reported >= 1024 * 1024:
+                                    self.add_progress(host, position - reported)
+                                    reported = position
+                                if position > end:
+                                    break
+                    response.close()
+                    self.add_progress(host, position - reported)
+
+                    if position != end + 1:
+                        raise Exception(f"分段数据不完整: {start}-{end}")
+                    return
+                except Exception as e:
+                    last_error = e
+            raise last_error
+
+        with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix="segment") as executor:
+            futures = [
+                executor.submit(fetch_segment, index, start, end)
+                for index, (start, end) in enumerate(ranges)
+            ]
+            for future in futures:
+                future.result()
+
+        if sha1 and _sha1_file(part_path) != sha1.lower():
+            raise Exception(f"SHA-1校验失败: {os.path.basename(path)}")
+
+        os.replace(part_path, path)
+        self.log(f"分段下载完成: {os.path.basename(path)} ({len(ranges)} 段)")
+
+    def probe_remote_size(self, url):
+        """获取远程文件大小"""
+        try:
+            response = self.http.head(url, timeout=self.http_timeout, allow_redirects=True)
+            response.raise_for_status()
+            if response.headers.get('accept-ranges', '').lower() != 'bytes':
+                return None
+            return int(response.headers['content-length'])
+        except Exception:
+            return None
+
+    def check_library_rules(self, rules):
+        """检查库规则是否适用当前系统"""
+        if not rules:
+            return True
+
+        system_name = platform.system().lower()
+        system_arch = platform.machine().lower()
+
+        allow = False
+        for rule in rules:
+            if rule['action'] == 'allow':
+                if 'os' in rule:
+                    if rule['os']['name'] != system_name:
+                        return False
+                    allow = True
+                else:
+                    allow = True
+            elif rule['action'] == 'disallow':
+                if 'os' in rule:
+                    if rule['os']['name'] == system_name:
+                        return False
+
+        return allow
+
+    def launch_game(self):
+        """启动游戏"""
+        selection = self.version_listbox.curselection()
+        if not selection:
+            messagebox.showerror("错误", "请选择要启动的版本")
+            return
+
+        version = self.version_listbox.get(selection[0])
+        username = self.username_entry.get().strip()
+        if not username:
+            messagebox.showerror("错误", "请输入用户名")
+            return
+
+        self.config['last_version'] = version
+
+        if not self.verify_java():
+            messagebox.showerror("错误", "请先验证Java路径是否正确")
+            return
+
+        # 在新线程中启动游戏
+        threading.Thread(
+            target=self._launch_game_thread,
+            args=(version, username),
+            daemon=True
+        ).start()
+
+    def _launch_game_thread(self, version, username):
+        """启动游戏的线程"""
+        # 启动时会读取这些文件，停止预读以免争用磁盘
+        self.prefetch_cancel.set()
+
+        try:
+            launch_start = time.perf_counter()
+            self.set_status(f"正在启动 {version}...")
+            self.log(f"准备启动版本 {version}...")
+
+            # 禁用按钮防止重复操作
+            self.toggle_buttons(False)
+
+            # 1. 加载启动计划（版本JSON未变化时直接使用缓存）
+            plan, cached = self.load_launch_plan(version)
+
+            # 2. 验证文件完整性
+            # 启动计划命中缓存时只检查classpath，避免每次启动都遍历全部资源文件
+            if not cached or not all(os.path.exists(path) for path in plan['classpath']):
+                version_data = self.load_version_data(version)
+                missing_files = self.verify_game_files(version, version_data)
+                if missing_files:
+                    self.log(f"缺失 {len(missing_files)} 个文件: {', '.join(missing_files[:10])}", "error")
+                    if not messagebox.askyesno("错误", "游戏文件不完整，是否尝试修复？"):
+                        return
+
+                    # 尝试重新下载缺失文件
+                    self.repair_game_files(version, version_data, missing_files)
+            else:
+                self.log("使用缓存的启动计划")
+
+            # 3. 准备natives目录
+            os.makedirs(plan['natives_dir'], exist_ok=True)
+
+            # 4. 构建启动命令
+            java_path = self.select_java_for_version(
+                self.java_entry.get().strip(),
+                plan['java_major'],
+                plan['java_component']
+            )
+            memory = self.memory_entry.get().strip()
 
             try:
                 memory_mb = int(memory)
@@ -1182,41 +2596,11 @@ class MinecraftBlueLauncher:
                 memory_mb = 2048
                 self.log("警告: 内存值无效，使用默认2048MB", "warning")
 
-            # 检查是否是Fabric或Forge版本
-            if "fabric" in version.lower():
+            if plan['loader'] == 'fabric':
                 self.log("检测到Fabric版本，使用Fabric启动逻辑")
-                cmd = self._build_fabric_command(java_path, memory_mb, version, version_data, natives_dir, username)
-            elif "forge" in version.lower():
+            elif plan['loader'] == 'forge':
                 self.log("检测到Forge版本，使用Forge启动逻辑")
-                cmd = self._build_forge_command(java_path, memory_mb, version, version_data, natives_dir, username)
-            else:
-                # 普通版本
-                cmd = [
-                    java_path,
-                    f"-Xmx{memory_mb}M",
-                    f"-Xms{max(512, memory_mb // 2)}M",
-                    f"-Djava.library.path={natives_dir}",
-                    f"-Dminecraft.client.jar={main_jar}",
-                    "-cp", classpath,
-                    version_data['mainClass'],
-                    "--username", username,
-                    "--version", version,
-                    "--gameDir", self.minecraft_dir,
-                    "--assetsDir", os.path.join(self.minecraft_dir, 'assets'),
-                    "--assetIndex", version_data['assets'],
-                    "--accessToken", "0",
-                    "--userType", "legacy",
-                    "--versionType", "release",
-                    "--width", "854",
-                    "--height", "480"
-                ]
-
-                # 6. 添加日志配置
-                cmd.extend([
-                    "-Dlog4j.configurationFile=client-1.12.xml",
-                    "-Dfml.ignoreInvalidMinecraftCertificates=true",
-                    "-Dfml.ignorePatchDiscrepancies=true"
-                ])
+            cmd = self.build_launch_command(plan, java_path, memory_mb, username)
 
             # 7. 启动游戏
             self.log("启动命令: " + " ".join(cmd))
@@ -1227,10 +2611,14 @@ class MinecraftBlueLauncher:
             os.makedirs(os.path.dirname(game_log_file), exist_ok=True)
 
             with open(game_log_file, 'w', encoding='utf-8') as log_f:
+                process_start = time.perf_counter()
                 process = self.create_game_process(cmd)
                 self.running_process = process
+                self.log(f"启动准备耗时 {(process_start - launch_start) * 1000:.0f}ms")
 
                 # 实时输出日志
+                first_output = True
+                game_loaded = False
                 while True:
                     output = process.stdout.readline()
                     if output == '' and process.poll() is not None:
@@ -1241,6 +2629,14 @@ class MinecraftBlueLauncher:
                         log_f.flush()
                         self.process_game_output(line.strip())
 
+                        # 记录JVM启动和游戏加载耗时，用于比较AppCDS等优化的效果
+                        if first_output:
+                            first_output = False
+                            self.log(f"JVM启动耗时 {time.perf_counter() - process_start:.2f}s（至首行输出）")
+                        if not game_loaded and "Sound engine started" in line:
+                            game_loaded = True
+                            self.log(f"游戏加载耗时 {time.perf_counter() - process_start:.2f}s", "success")
+
                 return_code = process.wait()
                 self.running_process = None
 
@@ -1259,103 +2655,848 @@ class MinecraftBlueLauncher:
             self.set_status("就绪")
             self.toggle_buttons(True)
 
-    def _build_fabric_command(self, java_path, memory_mb, version, version_data, natives_dir, username):
-        """构建Fabric启动命令"""
-        main_jar = os.path.join(self.minecraft_dir, 'versions', version, f"{version}.jar")
+    def get_launch_plan_path(self, version):
+        """获取版本启动计划缓存文件路径"""
+        return os.path.join(self.minecraft_dir, 'versions', version, '.launch_plan.json')
+
+    def load_version_data(self, version):
+        """加载版本信息"""
+        # 按inheritsFrom合并父版本，结果以继承链上各JSON的SHA-1为键缓存
+        cache_path = os.path.join(self.cache_dir, 'versions', f"{version}.json")
+        cached = self.version_data_cache.get(version) or self.read_json_file(cache_path)
+        if cached and self.check_version_stamps(cached['stamps']):
+            self.version_data_cache[version] = cached
+            return cached['data']
+
+        # 从子版本逐级读取到根版本
+        chain = []
+        current = version
+        while current:
+            if current in (item[0] for item in chain):
+                raise Exception(f"版本继承关系存在循环: {version}")
+
+            json_path = os.path.join(self.minecraft_dir, 'versions', current, f"{current}.json")
+            if not os.path.exists(json_path):
+                raise Exception(f"找不到版本 {current} 的版本信息，请先安装该版本")
+
+            with open(json_path, 'rb') as f:
+                raw = f.read()
+            stat = os.stat(json_path)
+            data = json.loads(raw.decode('utf-8'))
+            chain.append((current, json_path, data, hashlib.sha1(raw).hexdigest(), stat))
+            current = data.get('inheritsFrom')
+
+        key = hashlib.sha1("|".join(item[3] for item in chain).encode('utf-8')).hexdigest()
+        stamps = [[item[1], item[4].st_mtime_ns, item[4].st_size] for item in chain]
+
+        if cached and cached.get('key') == key:
+            # 文件被重新写入但内容未变，只更新时间戳
+            cached['stamps'] = stamps
+        else:
+            merged = chain[-1][2]
+            for item in reversed(chain[:-1]):
+                merged = self.merge_version_data(merged, item[2])
+            cached = {'key': key, 'stamps': stamps, 'data': merged}
+            if len(chain) > 1:
+                self.log(f"已合并版本继承链: {' -> '.join(item[0] for item in chain)}")
+
+        self.version_data_cache[version] = cached
+        try:
+            self.write_json_atomic(cache_path, cached)
+        except OSError as e:
+            self.log(f"保存版本信息缓存失败: {str(e)}", "warning")
+        return cached['data']
 
-        # 查找Fabric loader主类
-        fabric_loader_main_class = "net.fabricmc.loader.launch.knot.KnotClient"
+    def check_version_stamps(self, stamps):
+        """检查版本文件是否变化"""
+        try:
+            for path, mtime, size in stamps:
+                stat = os.stat(path)
+                if stat.st_mtime_ns != mtime or stat.st_size != size:
+                    return False
+        except (OSError, ValueError, TypeError):
+            return False
+        return True
+
+    def get_library_key(self, lib):
+        """获取库的去重键"""
+        parts = lib.get('name', '').split(':')
+        if len(parts) < 3:
+            return lib.get('name')
+        return ":".join(parts[:2] + parts[3:])
+
+    def merge_version_data(self, parent, child):
+        """合并父子版本信息"""
+        merged = dict(parent)
+        for key, value in child.items():
+            if key not in ('libraries', 'arguments', 'inheritsFrom'):
+                merged[key] = value
+
+        # 库列表（同一文档内的同名库可能带有不同系统规则，只在父子之间去重）
+        child_libraries = child.get('libraries', [])
+        child_keys = {self.get_library_key(lib) for lib in child_libraries}
+        merged['libraries'] = child_libraries + [
+            lib for lib in parent.get('libraries', [])
+            if self.get_library_key(lib) not in child_keys
+        ]
 
-        # 构建classpath
-        libraries = []
+        # 新版参数格式
+        if 'arguments' in parent or 'arguments' in child:
+            arguments = {}
+            for kind in ('game', 'jvm'):
+                arguments[kind] = parent.get('arguments', {}).get(kind, []) + \
+                    child.get('arguments', {}).get(kind, [])
+            merged['arguments'] = arguments
+
+        # 客户端JAR
+        if 'jar' not in child and 'downloads' not in child:
+            merged['jar'] = parent.get('jar') or parent['id']
+
+        return merged
+
+    def load_launch_plan(self, version):
+        """加载启动计划"""
+        # 返回 (plan, 是否命中缓存)
+        version_data = self.load_version_data(version)
+        chain_key = self.version_data_cache[version]['key']
+        plan_path = self.get_launch_plan_path(version)
+
+        plan = self.read_json_file(plan_path)
+        if plan and plan.get('format') == self.LAUNCH_PLAN_FORMAT and \
+                plan.get('minecraft_dir') == self.minecraft_dir and plan.get('chain_key') == chain_key:
+            return plan, True
+
+        plan = self.build_launch_plan(version, version_data)
+        plan['chain_key'] = chain_key
+        try:
+            self.write_json_atomic(plan_path, plan)
+        except OSError as e:
+            self.log(f"保存启动计划失败: {str(e)}", "warning")
+        self.log(f"已生成启动计划: {len(plan['classpath'])} 个classpath条目")
+        return plan, False
+
+    def build_launch_plan(self, version, version_data):
+        """生成启动计划"""
+        version_dir = os.path.join(self.minecraft_dir, 'versions', version)
         libraries_dir = os.path.join(self.minecraft_dir, 'libraries')
+        jar_version = version_data.get('jar', version)
+        main_jar = os.path.join(self.minecraft_dir, 'versions', jar_version, f"{jar_version}.jar")
+        natives_dir = os.path.join(version_dir, 'natives')
+
+        if "fabric" in version.lower():
+            loader = 'fabric'
+        elif "forge" in version.lower():
+            loader = 'forge'
+        else:
+            loader = 'vanilla'
 
+        # 构建classpath
+        classpath = [main_jar]
         for lib in version_data['libraries']:
-            if 'downloads' in lib and 'artifact' in lib['downloads']:
-                lib_path = os.path.join(
-                    libraries_dir,
-                    lib['downloads']['artifact']['path']
-                )
-                if os.path.exists(lib_path):
-                    libraries.append(lib_path)
+            if 'rules' in lib and not self.check_library_rules(lib['rules']):
+                continue
+
+            relative_path = self.get_library_path(lib)
+            if relative_path:
+                lib_path = os.path.join(libraries_dir, relative_path)
+                if lib_path not in classpath:
+                    classpath.append(lib_path)
+
+        # 启动时才能确定的变量（用户名等）保留为占位符，由 build_launch_command 替换
+        variables = {
+            'version_name': version,
+            'game_directory': self.minecraft_dir,
+            'assets_root': os.path.join(self.minecraft_dir, 'assets'),
+            'game_assets': os.path.join(self.minecraft_dir, 'assets'),
+            'assets_index_name': version_data.get('assets', ''),
+            'auth_access_token': "0",
+            'auth_session': "0",
+            'auth_xuid': "0",
+            'clientid': "0",
+            'user_type': "legacy",
+            'user_properties': "{}",
+            'version_type': version_data.get('type', "release"),
+            'natives_directory': natives_dir,
+            'library_directory': libraries_dir,
+            'classpath_separator': os.pathsep,
+            'classpath': os.pathsep.join(classpath),
+            'launcher_name': "EasyMinecraftLauncher",
+            'launcher_version': "1.0",
+            'resolution_width': "854",
+            'resolution_height': "480"
+        }
+        features = {'has_custom_resolution': True}
+
+        # 新版本使用arguments（已合并父版本），旧版本使用minecraftArguments
+        arguments = version_data.get('arguments')
+        if arguments:
+            jvm_args = self.resolve_arguments(arguments.get('jvm', []), features)
+            game_args = self.resolve_arguments(arguments.get('game', []), features)
+        elif version_data.get('minecraftArguments'):
+            jvm_args = ["-Djava.library.path=${natives_directory}", "-cp", "${classpath}"]
+            game_args = version_data['minecraftArguments'].split()
+            if loader == 'vanilla':
+                game_args += ["--width", "${resolution_width}", "--height", "${resolution_height}"]
+        else:
+            jvm_args = ["-Djava.library.path=${natives_directory}", "-cp", "${classpath}"]
+            game_args = [
+                "--username", "${auth_player_name}",
+                "--version", "${version_name}",
+                "--gameDir", "${game_directory}",
+                "--assetsDir", "${assets_root}",
+                "--assetIndex", "${assets_index_name}",
+                "--accessToken", "${auth_access_token}",
+                "--userType", "${user_type}",
+                "--versionType", "${version_type}"
+            ]
+            if loader == 'vanilla':
+                game_args += ["--width", "${resolution_width}", "--height", "${resolution_height}"]
+
+        jvm_args = [f"-Dminecraft.client.jar={main_jar}"] + self.substitute_arguments(jvm_args, variables)
+        game_args = self.substitute_arguments(game_args, variables)
+
+        # 加载器的系统属性必须位于主类之前才会生效
+        if loader == 'fabric':
+            main_class = version_data.get('mainClass', "net.fabricmc.loader.launch.knot.KnotClient")
+            jvm_args.append("-Dfabric.skipMcProvider=true")
+        elif loader == 'forge':
+            main_class = version_data.get('mainClass', "net.minecraft.launchwrapper.Launch")
+            if main_class == "net.minecraft.launchwrapper.Launch" and "--tweakClass" not in game_args:
+                game_args += ["--tweakClass", "net.minecraftforge.fml.common.launcher.FMLTweaker"]
+            jvm_args += [
+                "-Dfml.ignoreInvalidMinecraftCertificates=true",
+                "-Dfml.ignorePatchDiscrepancies=true"
+            ]
+        else:
+            main_class = version_data['mainClass']
+
+        return {
+            'format': self.LAUNCH_PLAN_FORMAT,
+            'minecraft_dir': self.minecraft_dir,
+            'version': version,
+            'loader': loader,
+            'main_jar': main_jar,
+            'natives_dir': natives_dir,
+            'classpath': classpath,
+            'main_class': main_class,
+            'java_major': version_data.get('javaVersion', {}).get('majorVersion'),
+            'java_component': version_data.get('javaVersion', {}).get('component'),
+            'jvm_args': jvm_args,
+            'game_args': game_args
+        }
+
+    def check_argument_rules(self, rules, features):
+        """检查参数规则"""
+        os_name = {"windows": "windows", "darwin": "osx", "linux": "linux"}.get(platform.system().lower())
+        is_x86 = platform.machine().lower() in ('x86', 'i386', 'i686')
+
+        allow = False
+        for rule in rules:
+            matched = True
+            rule_os = rule.get('os', {})
+            if 'name' in rule_os and rule_os['name'] != os_name:
+                matched = False
+            if 'arch' in rule_os and (rule_os['arch'] == 'x86') != is_x86:
+                matched = False
+            if 'version' in rule_os and not re.search(rule_os['version'], platform.release()):
+                matched = False
+            for feature, value in rule.get('features', {}).items():
+                if features.get(feature, False) != value:
+                    matched = False
+
+            if matched:
+                allow = rule['action'] == 'allow'
+        return allow
 
-        classpath = os.pathsep.join([main_jar] + libraries)
+    def resolve_arguments(self, arguments, features):
+        """展开启动参数"""
+        resolved = []
+        for argument in arguments:
+            if isinstance(argument, str):
+                resolved.append(argument)
+                continue
+
+            if not self.check_argument_rules(argument.get('rules', []), features):
+                continue
+            value = argument.get('value', [])
+            resolved.extend([value] if isinstance(value, str) else value)
+        return resolved
+
+    def substitute_arguments(self, arguments, variables):
+        """替换参数变量"""
+        return [
+            re.sub(r'\$\{(\w+)\}', lambda match: variables.get(match.group(1), match.group(0)), argument)
+            for argument in arguments
+        ]
+
+    def build_launch_command(self, plan, java_path, memory_mb, username):
+        """根据启动计划构建启动命令"""
+        # 离线模式的UUID与官方服务端的计算方式一致
+        offline_uuid = uuid.UUID(bytes=hashlib.md5(f"OfflinePlayer:{username}".encode('utf-8')).digest(), version=3)
+        variables = {'auth_player_name': username, 'auth_uuid': offline_uuid.hex}
 
-        cmd = [
+        return [
             java_path,
-            f"-Xmx{memory_mb}M",
-            f"-Xms{max(512, memory_mb // 2)}M",
-            f"-Djava.library.path={natives_dir}",
-            f"-Dminecraft.client.jar={main_jar}",
-            "-cp", classpath,
-            fabric_loader_main_class,
-            "--username", username,
-            "--version", version,
-            "--gameDir", self.minecraft_dir,
-            "--assetsDir", os.path.join(self.minecraft_dir, 'assets'),
-            "--assetIndex", version_data['assets'],
-            "--accessToken", "0",
-            "--userType", "legacy",
-            "--versionType", "release"
+            *self.get_jvm_args(java_path, memory_mb),
+            *self.get_cds_args(java_path, plan),
+            *plan['jvm_args'],
+            plan['main_class'],
+            *self.substitute_arguments(plan['game_args'], variables)
         ]
 
-        # 添加Fabric特定参数
-        cmd.extend([
-            "-Dfabric.skipMcProvider=true",
-            "-Dlog4j.configurationFile=client-1.12.xml"
-        ])
+    def get_cds_args(self, java_path, plan):
+        """生成AppCDS参数"""
+        # 归档名包含classpath、主类和Java的哈希，任一变化都会生成新归档
+        if not self.config.get('appcds_enabled', True):
+            return []
 
-        return cmd
+        java_major = self.get_java_info(java_path)['major']
+        if not java_major or java_major < 13:
+            return []
 
-    def _build_forge_command(self, java_path, memory_mb, version, version_data, natives_dir, username):
-        """构建Forge启动命令"""
-        main_jar = os.path.join(self.minecraft_dir, 'versions', version, f"{version}.jar")
+        resolved = shutil.which(java_path) or java_path
+        key = hashlib.sha1()
+        try:
+            java_stat = os.stat(resolved)
+            key.update(f"{resolved}|{java_stat.st_size}|{java_stat.st_mtime_ns}|{plan['main_class']}".encode('utf-8'))
+            for path in plan['classpath']:
+                stat = os.stat(path)
+                key.update(f"|{path}|{stat.st_size}|{stat.st_mtime_ns}".encode('utf-8'))
+        except OSError:
+            # classpath不完整时不使用归档，避免生成无效归档
+            return []
+
+        cds_dir = os.path.join(self.cache_dir, 'cds')
+        os.makedirs(cds_dir, exist_ok=True)
+        archive_name = f"{plan['version']}-{key.hexdigest()[:16]}.jsa"
+        archive_path = os.path.join(cds_dir, archive_name)
+
+        # 删除该版本过期的归档（精确匹配版本名，避免误删 1.20.1-forge-... 等其他版本的归档）
+        archive_pattern = re.compile(rf"^{re.escape(plan['version'])}-[0-9a-f]{{16}}\.jsa$")
+        for name in os.listdir(cds_dir):
+            if archive_pattern.match(name) and name != archive_name:
+                try:
+                    os.remove(os.path.join(cds_dir, name))
+                except OSError:
+                    pass
+
+        if java_major >= 19:
+            self.log("使用AppCDS归档（由Java自动维护）")
+            return ["-XX:+AutoCreateSharedArchive", f"-XX:SharedArchiveFile={archive_path}"]
+
+        if os.path.exists(archive_path) and os.path.getsize(archive_path) > 0:
+            self.log("使用AppCDS归档")
+            return [f"-XX:SharedArchiveFile={archive_path}"]
+
+        self.log("本次启动将在游戏退出时生成AppCDS归档，之后的启动会更快")
+        return [f"-XX:ArchiveClassesAtExit={archive_path}"]
+
+    def load_java_index(self):
+        """加载Java索引"""
+        # 调用时需持有java_index_lock
+        if self.java_index is None:
+            saved = self.read_json_file(os.path.join(self.cache_dir, 'java_index.json'))
+            self.java_index = saved.get('runtimes', {}) if isinstance(saved, dict) else {}
+        return self.java_index
+
+    def save_java_index(self):
+        """保存Java运行时索引"""
+        with self.java_index_lock:
+            runtimes = copy.deepcopy(self.load_java_index())
+        try:
+            self.write_json_atomic(os.path.join(self.cache_dir, 'java_index.json'), {'runtimes': runtimes})
+        except OSError as e:
+            self.log(f"保存Java索引失败: {str(e)}", "warning")
 
-        # 查找Forge主类
-        forge_main_class = "net.minecraft.launchwrapper.Launch"
+    def probe_java(self, java_path):
+        """获取Java版本信息"""
+        info = {'major': None, 'version': None, 'vendor': None, 'arch': None}
+        try:
+            result = subprocess.run(
+                [java_path, "-XshowSettings:properties", "-version"],
+                stderr=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+                timeout=10
+            )
+        except Exception as e:
+            self.log(f"获取Java版本失败: {java_path} - {str(e)}", "warning")
+            return info
 
-        # 构建classpath
-        libraries = []
-        libraries_dir = os.path.join(self.minecraft_dir, 'libraries')
+        output = (result.stderr or "") + (result.stdout or "")
+        properties = dict(re.findall(r'^\s*(java\.version|java\.vendor|os\.arch) = (.*)$', output, re.M))
+        info['vendor'] = properties.get('java.vendor', '').strip() or None
+        info['arch'] = properties.get('os.arch', '').strip() or None
 
-        for lib in version_data['libraries']:
-            if 'downloads' in lib and 'artifact' in lib['downloads']:
-                lib_path = os.path.join(
-                    libraries_dir,
-                    lib['downloads']['artifact']['path']
+        version = properties.get('java.version', '').strip()
+        if not version:
+            match = re.search(r'version "([^"]+)"', output)
+            version = match.group(1) if match else ''
+
+        match = re.match(r'(\d+)(?:\.(\d+))?', version)
+        if match:
+            info['version'] = version
+            info['major'] = int(match.group(1))
+            # Java 8及以前的版本号格式为1.x
+            if info['major'] == 1 and match.group(2):
+                info['major'] = int(match.group(2))
+        return info
+
+    def get_java_stamp(self, java_path):
+        """获取Java文件信息"""
+        resolved = os.path.realpath(shutil.which(java_path) or java_path)
+        try:
+            stat = os.stat(resolved)
+        except OSError:
+            return None
+        return resolved, stat.st_size, stat.st_mtime_ns
+
+    def get_java_info(self, java_path):
+        """获取Java信息"""
+        stamp = self.get_java_stamp(java_path)
+        if stamp is None:
+            return {'major': None, 'version': None, 'vendor': None, 'arch': None, 'options': {}}
+
+        resolved, size, mtime = stamp
+        with self.java_index_lock:
+            entry = self.load_java_index().get(resolved)
+        if entry and entry['size'] == size and entry['mtime'] == mtime:
+            return entry
+
+        entry = {**self.probe_java(resolved), 'size': size, 'mtime': mtime, 'options': {}}
+        with self.java_index_lock:
+            self.load_java_index()[resolved] = entry
+        self.save_java_index()
+        return entry
+
+    def java_supports_option(self, java_path, option):
+        """检查Java参数支持"""
+        info = self.get_java_info(java_path)
+        if option not in info['options']:
+            try:
+                result = subprocess.run(
+                    [java_path, option, "-version"],
+                    stderr=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    timeout=5
                 )
-                if os.path.exists(lib_path):
-                    libraries.append(lib_path)
+                supported = result.returncode == 0
+            except Exception:
+                supported = False
+
+            # 索引条目与 self.java_index 共享，需在锁内修改
+            with self.java_index_lock:
+                info['options'][option] = supported
+            if info['major']:
+                self.save_java_index()
+        return info['options'][option]
+
+    def get_java_search_patterns(self):
+        """常见的Java位置"""
+        exe = "java.exe" if platform.system() == "Windows" else "java"
+        runtime_dir = os.path.join(self.minecraft_dir, 'runtime')
+        patterns = [
+            # 官方启动器的运行时布局: runtime/<组件>/<平台>/<组件>/bin/java
+            os.path.join(runtime_dir, '*', '*', '*', 'bin', exe),
+            os.path.join(runtime_dir, '*', '*', '*', 'jre.bundle', 'Contents', 'Home', 'bin', exe)
+        ]
 
-        classpath = os.pathsep.join([main_jar] + libraries)
+        java_home = os.getenv('JAVA_HOME')
+        if java_home:
+            patterns.append(os.path.join(java_home, 'bin', exe))
 
-        cmd = [
-            java_path,
-            f"-Xmx{memory_mb}M",
-            f"-Xms{max(512, memory_mb // 2)}M",
-            f"-Djava.library.path={natives_dir}",
-            f"-Dminecraft.client.jar={main_jar}",
-            "-cp", classpath,
-            forge_main_class,
-            "--username", username,
-            "--version", version,
-            "--gameDir", self.minecraft_dir,
-            "--assetsDir", os.path.join(self.minecraft_dir, 'assets'),
-            "--assetIndex", version_data['assets'],
-            "--accessToken", "0",
-            "--userType", "legacy",
-            "--versionType", "release",
-            "--tweakClass", "net.minecraftforge.fml.common.launcher.FMLTweaker"
+        system = platform.system()
+        if system == "Windows":
+            bases = {os.getenv(name) for name in ('ProgramFiles', 'ProgramFiles(x86)', 'ProgramW6432')}
+            vendors = [
+                'Java', 'Eclipse Adoptium', 'Eclipse Foundation', 'AdoptOpenJDK', 'Zulu',
+                'BellSoft', 'Microsoft', 'Amazon Corretto', 'Semeru'
+            ]
+            for base in filter(None, bases):
+                for vendor in vendors:
+                    patterns.append(os.path.join(base, vendor, '*', 'bin', exe))
+                patterns.append(os.path.join(base, 'Minecraft Launcher', 'runtime', '*', '*', '*', 'bin', exe))
+        elif system == "Darwin":
+            for base in ('/Library/Java/JavaVirtualMachines', os.path.expanduser('~/Library/Java/JavaVirtualMachines')):
+                patterns.append(os.path.join(base, '*', 'Contents', 'Home', 'bin', exe))
+            patterns.append('/opt/homebrew/opt/openjdk*/bin/java')
+            patterns.append('/usr/local/opt/openjdk*/bin/java')
+        else:
+            patterns += [
+                '/usr/lib/jvm/*/bin/java',
+                '/usr/lib64/jvm/*/bin/java',
+                '/opt/java/*/bin/java',
+                '/opt/*/bin/java',
+                os.path.expanduser('~/.sdkman/candidates/java/*/bin/java'),
+                os.path.expanduser('~/.jdks/*/bin/java')
+            ]
+        return patterns
+
+    def refresh_java_index(self):
+        """扫描Java运行时"""
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                found = [path for paths in executor.map(glob.glob, self.get_java_search_patterns()) for path in paths]
+                found += [path for path in (shutil.which('java'), self.config.get('java_path')) if path]
+
+                stamps = {}
+                for path in found:
+                    stamp = self.get_java_stamp(path)
+                    if stamp:
+                        stamps[stamp[0]] = stamp
+
+                with self.java_index_lock:
+                    index = self.load_java_index()
+                    # 移除已被删除的Java
+                    for path in [path for path in index if not os.path.exists(path)]:
+                        del index[path]
+                    stale = [
+                        stamp for path, stamp in stamps.items()
+                        if path not in index or (index[path]['size'], index[path]['mtime']) != stamp[1:]
+                    ]
+
+                for (path, size, mtime), info in zip(stale, executor.map(self.probe_java, [s[0] for s in stale])):
+                    with self.java_index_lock:
+                        self.load_java_index()[path] = {**info, 'size': size, 'mtime': mtime, 'options': {}}
+
+            self.save_java_index()
+            with self.java_index_lock:
+                runtimes = [entry for entry in self.load_java_index().values() if entry['major']]
+            self.log(f"检测到 {len(runtimes)} 个Java运行时: " + ", ".join(
+                sorted({f"Java {entry['major']}" for entry in runtimes}, key=lambda text: int(text.split()[1]))
+            ))
+        except Exception as e:
+            self.log(f"扫描Java运行时失败: {str(e)}", "warning")
+
+    def select_java_for_version(self, java_path, required_major, component=None):
+        """为版本选择Java"""
+        # 依次选择：主版本一致的64位Java、官方运行时、更高版本的Java、当前设置
+        if not required_major:
+            return java_path
+
+        current_major = self.get_java_info(java_path)['major']
+        if current_major == required_major:
+            return java_path
+
+        with self.java_index_lock:
+            runtimes = [
+                (path, entry) for path, entry in self.load_java_index().items()
+                if entry['major'] and entry['major'] >= required_major
+            ]
+        runtimes = [(path, entry) for path, entry in runtimes if os.path.exists(path)]
+        runtimes.sort(key=lambda item: (
+            item[1]['major'],
+            (item[1]['arch'] or '') not in ('amd64', 'x86_64', 'aarch64', 'arm64'),
+            item[0]
+        ))
+
+        exact = [item for item in runtimes if item[1]['major'] == required_major]
+        if not exact and component and self.config.get('managed_java', True):
+            try:
+                path = self.install_java_runtime(component, self.get_mirror_url())
+                entry = self.get_java_info(path)
+                if entry['major']:
+                    exact = [(path, entry)]
+            except Exception as e:
+                self.log(f"下载Java运行时失败: {str(e)}", "error")
+
+        if exact:
+            path, entry = exact[0]
+        elif required_major >= 16 and current_major and current_major > required_major:
+            # 新版游戏可以使用更高版本的Java，旧版（Java 8）不行
+            return java_path
+        elif runtimes:
+            path, entry = runtimes[0]
+        else:
+            self.log(f"警告: 该版本需要Java {required_major}，当前为Java {current_major or '未知'}，未找到合适的Java", "warning")
+            return java_path
+
+        self.log(f"该版本需要Java {required_major}，自动使用: {path} (Java {entry['major']})")
+        return path
+
+    def get_java_runtime_platform(self):
+        """获取运行时平台"""
+        system = platform.system()
+        machine = platform.machine().lower()
+        if system == "Windows":
+            if machine in ('arm64', 'aarch64'):
+                return "windows-arm64"
+            return "windows-x64" if machine.endswith('64') else "windows-x86"
+        if system == "Darwin":
+            return "mac-os-arm64" if machine in ('arm64', 'aarch64') else "mac-os"
+        if system == "Linux":
+            if machine in ('x86_64', 'amd64'):
+                return "linux"
+            if machine in ('i386', 'i686', 'x86'):
+                return "linux-i386"
+        return None
+
+    def get_java_runtime_dir(self, component):
+        """获取运行时目录"""
+        runtime_platform = self.get_java_runtime_platform()
+        return os.path.join(self.minecraft_dir, 'runtime', component, runtime_platform, component)
+
+    def get_managed_java_path(self, runtime_dir):
+        """获取运行时Java路径"""
+        if platform.system() == "Windows":
+            return os.path.join(runtime_dir, 'bin', 'java.exe')
+        if platform.system() == "Darwin":
+            return os.path.join(runtime_dir, 'jre.bundle', 'Contents', 'Home', 'bin', 'java')
+        return os.path.join(runtime_dir, 'bin', 'java')
+
+    def install_java_runtime(self, component, mirror_url, check_hash=False):
+        """安装Java运行时"""
+        # 文件按SHA-1保存在 runtime/objects 中，各运行时共用
+        runtime_platform = self.get_java_runtime_platform()
+        if not runtime_platform:
+            raise Exception(f"当前系统不支持自动下载Java运行时: {platform.system()} {platform.machine()}")
+
+        all_runtimes = self.fetch_json_cached(self.rewrite_to_mirror(self.JAVA_RUNTIME_MANIFEST, mirror_url))
+        entries = all_runtimes.get(runtime_platform, {}).get(component)
+        if not entries:
+            raise Exception(f"没有适用于 {runtime_platform} 的Java运行时 {component}")
+
+        manifest_info = entries[0]['manifest']
+        runtime_name = entries[0].get('version', {}).get('name', component)
+        runtime_dir = self.get_java_runtime_dir(component)
+        java_path = self.get_managed_java_path(runtime_dir)
+        marker_path = os.path.join(os.path.dirname(runtime_dir), '.installed.json')
+
+        marker = self.read_json_file(marker_path)
+        installed = bool(marker) and marker.get('manifest_sha1') == manifest_info['sha1'] and \
+            os.path.exists(java_path)
+        if installed and not check_hash:
+            return java_path
+
+        self.log(f"准备Java运行时 {component} ({runtime_name})...")
+        # 运行时清单以SHA-1为地址，内容不会变化
+        manifest = self.fetch_json_cached(
+            self.rewrite_to_mirror(manifest_info['url'], mirror_url),
+            ttl=365 * 86400
+        )
+        files = manifest['files']
+
+        # 按SHA-1收集文件，相同内容只保存一份
+        objects_dir = os.path.join(self.minecraft_dir, 'runtime', 'objects')
+        objects = {}
+        for entry in files.values():
+            if entry['type'] == 'file':
+                objects.setdefault(entry['downloads']['raw']['sha1'], entry)
+
+        missing = [
+            sha1 for sha1, entry in objects.items()
+            if not self.is_file_valid(
+                os.path.join(objects_dir, sha1[:2], sha1), None, entry['downloads']['raw']['size']
+            )
         ]
+        if check_hash:
+            missing_set = set(missing)
+            missing += self.verify_file_hashes([
+                (sha1, os.path.join(objects_dir, sha1[:2], sha1), sha1)
+                for sha1 in objects if sha1 not in missing_set
+            ])
+
+        if installed and not missing:
+            self.log(f"Java运行时 {component} ({runtime_name}) 校验通过", "success")
+            return java_path
+
+        jobs = []
+        for sha1 in missing:
+            entry = objects[sha1]
+            raw = entry['downloads']['raw']
+            object_path = os.path.join(objects_dir, sha1[:2], sha1)
+            compressed = entry['downloads'].get('lzma')
+            source = compressed or raw
+            source_url = self.rewrite_to_mirror(source['url'], mirror_url)
+            jobs.append({
+                'kind': 'runtime',
+                'name': raw['sha1'],
+                'url': source_url,
+                'fallback_urls': self.get_fallback_urls(source['url'], source_url),
+                'path': f"{object_path}.lzma" if compressed else object_path,
+                'sha1': source['sha1'],
+                'size': source['size'],
+                'object_path': object_path,
+                'raw_sha1': raw['sha1'] if compressed else None
+            })
+
+        self.log(f"Java运行时共 {len(objects)} 个文件，需下载 {len(jobs)} 个")
+        failures = self.run_download_jobs(jobs, "Java运行时")
+        self.log_download_failures(failures)
+        if failures:
+            raise Exception(f"{len(failures)} 个Java运行时文件下载失败")
+
+        # 解压LZMA文件（解压时会释放GIL，可以并行）
+        compressed_jobs = [job for job in jobs if job['raw_sha1']]
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+            list(executor.map(self.decompress_runtime_object, compressed_jobs))
+
+        self.link_java_runtime(files, runtime_dir, objects_dir)
+        self.write_json_atomic(marker_path, {
+            'manifest_sha1': manifest_info['sha1'],
+            'version': runtime_name
+        })
+        self.log(f"Java运行时 {component} ({runtime_name}) 已就绪", "success")
+        return java_path
+
+    def decompress_runtime_object(self, job):
+        """解压运行时文件"""
+        tmp_path = f"{job['object_path']}.tmp"
+        sha1 = hashlib.sha1()
+        with lzma.open(job['path'], 'rb') as src, open(tmp_path, 'wb') as dst:
+            for block in iter(lambda: src.read(1024 * 1024), b''):
+                sha1.update(block)
+                dst.write(block)
+
+        if sha1.hexdigest() != job['raw_sha1']:
+            os.remove(tmp_path)
+            raise Exception(f"解压后SHA-1不匹配: {job['raw_sha1']}")
+        os.replace(tmp_path, job['object_path'])
+        os.remove(job['path'])
+
+    def link_java_runtime(self, files, runtime_dir, objects_dir):
+        """建立运行时目录"""
+        tmp_dir = f"{runtime_dir}.tmp"
+        if os.path.exists(tmp_dir):
+            shutil.rmtree(tmp_dir)
+        os.makedirs(tmp_dir)
+
+        # 目录排在前面，保证父目录先于其中的文件创建
+        for name, entry in sorted(files.items(), key=lambda item: item[1]['type'] != 'directory'):
+            target = os.path.join(tmp_dir, *name.split('/'))
+            if entry['type'] == 'directory':
+                os.makedirs(target, exist_ok=True)
+                continue
 
-        # 添加Forge特定参数
-        cmd.extend([
-            "-Dfml.ignoreInvalidMinecraftCertificates=true",
-            "-Dfml.ignorePatchDiscrepancies=true",
-            "-Dlog4j.configurationFile=client-1.12.xml"
-        ])
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if entry['type'] == 'file':
+                sha1 = entry['downloads']['raw']['sha1']
+                object_path = os.path.join(objects_dir, sha1[:2], sha1)
+                if entry.get('executable') and platform.system() != "Windows":
+                    os.chmod(object_path, 0o755)
+                # JVM按java可执行文件的真实路径查找lib目录，运行时文件不能使用符号链接
+                self.link_file(object_path, target, allow_symlink=False)
+            elif entry['type'] == 'link':
+                try:
+                    os.symlink(entry['target'], target)
+                except OSError as e:
+                    self.log(f"创建符号链接失败: {name} - {str(e)}", "warning")
+
+        if os.path.exists(runtime_dir):
+            shutil.rmtree(runtime_dir)
+        os.rename(tmp_dir, runtime_dir)
+
+    def get_total_memory_mb(self):
+        """获取物理内存"""
+        try:
+            import psutil
+            return psutil.virtual_memory().total // 1024 // 1024
+        except ImportError:
+            return None
+
+    def select_jvm_profile(self, java_path, java_major, memory_mb, total_mb):
+        """选择JVM配置"""
+        if not java_major or java_major < 8:
+            return "默认"
+
+        # 物理内存余量不足时不使用预先占用整个堆的Aikar参数
+        if total_mb and total_mb - memory_mb < 2048:
+            return "G1低延迟"
+
+        # 大堆内存在Java 21及以上使用分代ZGC
+        if memory_mb >= 12288 and java_major >= 21 and self.java_supports_option(java_path, "-XX:+UseZGC"):
+            return "ZGC"
+
+        if memory_mb >= 4096:
+            return "Aikar"
+        return "G1低延迟"
+
+    def get_jvm_args(self, java_path, memory_mb):
+        """生成JVM参数"""
+        java_major = self.get_java_info(java_path)['major']
+        total_mb = self.get_total_memory_mb()
+        profile = self.config.get('jvm_profile', "自动")
+
+        if total_mb and memory_mb > total_mb * 3 // 4:
+            self.log(f"警告: 分配的内存 {memory_mb}MB 超过物理内存 {total_mb}MB 的75%", "warning")
+
+        if profile == "自动":
+            profile = self.select_jvm_profile(java_path, java_major, memory_mb, total_mb)
+
+        if profile == "ZGC" and not ((java_major or 0) >= 15 and self.java_supports_option(java_path, "-XX:+UseZGC")):
+            self.log("当前Java不支持ZGC（需要Java 15及以上），改用G1低延迟配置", "warning")
+            profile = "G1低延迟"
+        elif profile == "Shenandoah" and not self.java_supports_option(java_path, "-XX:+UseShenandoahGC"):
+            self.log("当前Java不支持Shenandoah GC，改用G1低延迟配置", "warning")
+            profile = "G1低延迟"
+        elif profile in ("G1低延迟", "Aikar") and (java_major or 0) < 8:
+            profile = "默认"
+
+        self.log(f"JVM配置: {profile} (Java {java_major or '未知'}，堆内存 {memory_mb}MB)")
+
+        if profile == "G1低延迟":
+            return [
+                f"-Xmx{memory_mb}M",
+                f"-Xms{max(512, memory_mb // 2)}M",
+                "-XX:+UnlockExperimentalVMOptions",
+                "-XX:+UseG1GC",
+                "-XX:G1NewSizePercent=20",
+                "-XX:G1ReservePercent=20",
+                "-XX:MaxGCPauseMillis=50",
+                "-XX:G1HeapRegionSize=32M"
+            ]
+
+        if profile == "Aikar":
+            # 超过12GB堆内存时使用Aikar推荐的大内存参数
+            large = memory_mb >= 12288
+            return [
+                f"-Xmx{memory_mb}M",
+                f"-Xms{memory_mb}M",
+                "-XX:+UseG1GC",
+                "-XX:+ParallelRefProcEnabled",
+                "-XX:MaxGCPauseMillis=200",
+                "-XX:+UnlockExperimentalVMOptions",
+                "-XX:+DisableExplicitGC",
+                "-XX:+AlwaysPreTouch",
+                f"-XX:G1NewSizePercent={40 if large else 30}",
+                f"-XX:G1MaxNewSizePercent={50 if large else 40}",
+                f"-XX:G1HeapRegionSize={16 if large else 8}M",
+                f"-XX:G1ReservePercent={15 if large else 20}",
+                "-XX:G1HeapWastePercent=5",
+                "-XX:G1MixedGCCountTarget=4",
+                f"-XX:InitiatingHeapOccupancyPercent={20 if large else 15}",
+                "-XX:G1MixedGCLiveThresholdPercent=90",
+                "-XX:G1RSetUpdatingPauseTimePercent=5",
+                "-XX:SurvivorRatio=32",
+                "-XX:+PerfDisableSharedMem",
+                "-XX:MaxTenuringThreshold=1"
+            ]
+
+        if profile == "ZGC":
+            args = [
+                f"-Xmx{memory_mb}M",
+                f"-Xms{max(512, memory_mb // 2)}M",
+                "-XX:+UseZGC"
+            ]
+            # Java 21、22需要手动开启分代模式，之后的版本默认开启
+            if java_major in (21, 22):
+                args.append("-XX:+ZGenerational")
+            return args
+
+        if profile == "Shenandoah":
+            return [
+                f"-Xmx{memory_mb}M",
+                f"-Xms{max(512, memory_mb // 2)}M",
+                "-XX:+UseShenandoahGC",
+                "-XX:+DisableExplicitGC"
+            ]
 
-        return cmd
+        return [
+            f"-Xmx{memory_mb}M",
+            f"-Xms{max(512, memory_mb // 2)}M"
+        ]
 
     def create_game_process(self, cmd):
         """创建游戏进程"""
@@ -1403,41 +3544,141 @@ class MinecraftBlueLauncher:
 
     def verify_game_files(self, version, version_data):
         """验证游戏文件完整性"""
-        missing_files = []
+        plan = self.build_install_plan(version, version_data, self.get_mirror_url())
+        return [action['name'] for action in self.diff_install_plan(plan)]
+
+    def deep_verify_version(self):
+        """深度校验选中版本的全部文件"""
+        selection = self.version_listbox.curselection()
+        if not selection:
+            messagebox.showerror("错误", "请选择要校验的版本")
+            return
 
-        # 检查主JAR
-        jar_path = os.path.join(self.minecraft_dir, 'versions', version, f"{version}.jar")
-        if not os.path.exists(jar_path):
-            missing_files.append(f"{version}.jar")
+        version = self.version_listbox.get(selection[0])
+        threading.Thread(
+            target=self._deep_verify_thread,
+            args=(version,),
+            daemon=True
+        ).start()
 
-        # 检查资源索引
-        assets_index_path = os.path.join(
-            self.minecraft_dir,
-            'assets',
-            'indexes',
-            f"{version_data['assets']}.json"
-        )
-        if not os.path.exists(assets_index_path):
-            missing_files.append(f"assets/indexes/{version_data['assets']}.json")
+    def _deep_verify_thread(self, version):
+        """深度校验的线程"""
+        try:
+            self.set_status(f"正在校验 {version}...")
+            self.toggle_buttons(False)
 
-        # 检查关键库文件
-        libraries_dir = os.path.join(self.minecraft_dir, 'libraries')
-        for lib in version_data['libraries']:
-            if 'rules' in lib and not self.check_library_rules(lib['rules']):
+            version_data = self.load_version_data(version)
+
+            # 已下载的官方Java运行时也一并校验，损坏的文件直接重新下载
+            component = version_data.get('javaVersion', {}).get('component')
+            if component and self.get_java_runtime_platform() and \
+                    os.path.isdir(self.get_java_runtime_dir(component)):
+                self.log(f"校验Java运行时 {component}...")
+                self.install_java_runtime(component, self.get_mirror_url(), check_hash=True)
+
+            bad_files = self.deep_verify_game_files(version, version_data)
+            if not bad_files:
+                self.log(f"{version} 的全部文件校验通过", "success")
+                messagebox.showinfo("完成", f"{version} 的全部文件校验通过")
+                return
+
+            self.log(f"发现 {len(bad_files)} 个缺失或损坏的文件: {', '.join(bad_files[:10])}", "error")
+            if messagebox.askyesno("校验结果", f"发现 {len(bad_files)} 个缺失或损坏的文件，是否修复？"):
+                self.repair_game_files(version, version_data, bad_files)
+        except Exception as e:
+            error_msg = str(e)
+            self.log(f"校验失败: {error_msg}", "error")
+            self.log(traceback.format_exc(), "error")
+            messagebox.showerror("错误", f"校验失败:\n{error_msg}")
+        finally:
+            self.set_status("就绪")
+            self.toggle_buttons(True)
+
+    def deep_verify_game_files(self, version, version_data):
+        """深度校验游戏文件"""
+        plan = self.build_install_plan(version, version_data, self.get_mirror_url())
+        bad_files = [action['name'] for action in self.diff_install_plan(plan)]
+        bad_names = set(bad_files)
+
+        bad_files += self.verify_file_hashes([
+            (action['name'], action['path'], action['sha1'])
+            for action in plan['actions']
+            if action['sha1'] and action['name'] not in bad_names
+        ])
+        return bad_files
+
+    def verify_file_hashes(self, files):
+        """校验文件SHA-1"""
+        # files 为 (名称, 路径, SHA-1) 列表，返回损坏的文件名
+        bad_files = []
+        self.load_hash_cache()
+        to_hash = []
+        for name, path, expected in files:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                bad_files.append(name)
                 continue
 
-            if 'downloads' not in lib or 'artifact' not in lib['downloads']:
+            cached = self.hash_cache.get(path)
+            if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+                if cached[2] != expected:
+                    bad_files.append(name)
                 continue
+            to_hash.append((name, path, expected, stat))
 
-            lib_path = os.path.join(
-                libraries_dir,
-                lib['downloads']['artifact']['path']
-            )
+        self.log(f"深度校验: 共 {len(files)} 个文件，需计算哈希 {len(to_hash)} 个")
+        self.begin_progress(sum(item[3].st_size for item in to_hash), len(to_hash))
+        try:
+            paths = [item[1] for item in to_hash]
+            if len(paths) < 16:
+                # 文件很少时不值得启动进程池
+                results = map(_sha1_file, paths)
+                executor = None
+            else:
+                # 主进程中有Tk和多个线程池，fork可能导致子进程死锁，统一使用spawn
+                executor = ProcessPoolExecutor(
+                    max_workers=os.cpu_count() or 1,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                results = executor.map(_sha1_file, paths, chunksize=8)
 
-            if not os.path.exists(lib_path):
-                missing_files.append(lib['downloads']['artifact']['path'])
+            try:
+                for (name, path, expected, stat), sha1 in zip(to_hash, results):
+                    self.add_progress("本地校验", stat.st_size)
+                    self.finish_progress_file()
+                    if sha1 is None:
+                        bad_files.append(name)
+                        continue
 
-        return missing_files
+                    with self.hash_cache_lock:
+                        self.hash_cache[path] = [stat.st_size, stat.st_mtime_ns, sha1]
+                    if sha1 != expected:
+                        bad_files.append(name)
+            finally:
+                if executor:
+                    executor.shutdown(cancel_futures=True)
+        finally:
+            self.end_progress()
+            self.save_hash_cache()
+
+        return bad_files
+
+    def load_hash_cache(self):
+        """加载文件SHA-1缓存"""
+        with self.hash_cache_lock:
+            if self.hash_cache is None:
+                saved = self.read_json_file(os.path.join(self.cache_dir, 'hash_cache.json'))
+                self.hash_cache = saved.get('files', {}) if isinstance(saved, dict) else {}
+
+    def save_hash_cache(self):
+        """保存文件SHA-1缓存"""
+        with self.hash_cache_lock:
+            files = dict(self.hash_cache)
+        try:
+            self.write_json_atomic(os.path.join(self.cache_dir, 'hash_cache.json'), {'files': files})
+        except OSError as e:
+            self.log(f"保存哈希缓存失败: {str(e)}", "warning")
 
     def repair_game_files(self, version, version_data, missing_files):
         """修复缺失的游戏文件"""
@@ -1445,53 +3686,30 @@ class MinecraftBlueLauncher:
 
         try:
             self.log("尝试修复缺失文件...")
-
-            # 修复主JAR
-            jar_path = os.path.join(self.minecraft_dir, 'versions', version, f"{version}.jar")
-            if f"{version}.jar" in missing_files:
-                client_url = version_data['downloads']['client']['url']
-                client_url = client_url.replace(
-                    "https://launcher.mojang.com",
-                    mirror_url
-                )
-                self.log(f"重新下载客户端: {client_url}")
-                self.download_file(client_url, jar_path)
-
-            # 修复资源索引
-            assets_index_path = os.path.join(
-                self.minecraft_dir,
-                'assets',
-                'indexes',
-                f"{version_data['assets']}.json"
-            )
-            if f"assets/indexes/{version_data['assets']}.json" in missing_files:
-                assets_url = version_data['assetIndex']['url']
-                assets_url = assets_url.replace(
-                    "https://launchermeta.mojang.com",
-                    mirror_url
-                )
-                self.log(f"重新下载资源索引: {assets_url}")
-                self.download_file(assets_url, assets_index_path)
-
-            # 修复库文件
-            libraries_dir = os.path.join(self.minecraft_dir, 'libraries')
-            for lib in version_data['libraries']:
-                if 'downloads' not in lib or 'artifact' not in lib['downloads']:
-                    continue
-
-                lib_path = os.path.join(
-                    libraries_dir,
-                    lib['downloads']['artifact']['path']
-                )
-
-                if lib['downloads']['artifact']['path'] in missing_files:
-                    lib_url = lib['downloads']['artifact']['url']
-                    lib_url = lib_url.replace(
-                        "https://libraries.minecraft.net",
-                        f"{mirror_url}/maven"
-                    )
-                    self.log(f"重新下载库: {lib_url}")
-                    self.download_file(lib_url, lib_path)
+            missing_files = set(missing_files)
+
+            # 资源索引缺失时先下载，之后才能列出资源文件
+            asset_index_action = self.get_asset_index_action(version_data, mirror_url)
+            if asset_index_action['name'] in missing_files:
+                self.log(f"重新下载资源索引: {asset_index_action['url']}")
+                self.download_plan_action(asset_index_action)
+
+            # 按名称选取而不是重新比较大小，深度校验发现的损坏文件大小可能是正确的
+            plan = self.build_install_plan(version, version_data, mirror_url)
+            missing = [action for action in plan['actions'] if action['name'] in missing_files]
+            if asset_index_action['name'] in missing_files:
+                # 资源索引此前缺失，其中的资源文件也需要补全
+                names = {action['name'] for action in missing}
+                missing += [action for action in self.diff_install_plan(plan) if action['name'] not in names]
+
+            failures = self.run_download_jobs(missing, "修复")
+            for job, error in failures[:10]:
+                self.log(f"重新下载失败: {job['url']} - {str(error)}", "error")
+            if failures:
+                raise Exception(f"{len(failures)} 个文件修复失败")
+
+            if any(action['kind'] == 'native' for action in missing):
+                self.extract_natives(version, plan)
 
             self.log("文件修复完成", "success")
             return True
@@ -1694,7 +3912,7 @@ class MinecraftBlueLauncher:
             # 直接使用Fabric官方API
             fabric_meta_url = "https://meta.fabricmc.net/v2/versions/loader"
             self.log(f"从Fabric官方API获取版本列表: {fabric_meta_url}")
-            response = requests.get(fabric_meta_url, timeout=10)
+            response = self.http.get(fabric_meta_url, timeout=self.http_timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -1714,52 +3932,39 @@ class MinecraftBlueLauncher:
             fabric_profile_url = f"https://meta.fabricmc.net/v2/versions/loader/{base_version}/{fabric_version['version']}/profile/json"
             self.log(f"获取Fabric安装配置: {fabric_profile_url}")
 
-            response = requests.get(fabric_profile_url, timeout=30)
+            response = self.http.get(fabric_profile_url, timeout=self.http_timeout)
             response.raise_for_status()
 
             fabric_profile = response.json()
             fabric_version_id = fabric_profile['id']
 
-            # 2. 创建版本目录
+            # 2. 并发下载Fabric相关库文件
+            mirror_url = self.get_mirror_url()
+            jobs = []
+            for lib in fabric_profile['libraries']:
+                if 'rules' in lib and not self.check_library_rules(lib['rules']):
+                    continue
+                action = self.get_library_action(lib, mirror_url)
+                if action:
+                    jobs.append(action)
+
+            failures = self.run_download_jobs(jobs, "Fabric库")
+            for job, error in failures:
+                self.log(f"下载Fabric库失败: {job['url']} - {str(error)}", "error")
+            if failures:
+                # 库文件不完整时不保存版本信息，避免版本出现在列表中却无法启动
+                raise Exception(f"{len(failures)} 个Fabric库下载失败，请重新安装")
+
+            # 3. 创建版本目录
             version_dir = os.path.join(self.minecraft_dir, 'versions', fabric_version_id)
             os.makedirs(version_dir, exist_ok=True)
 
-            # 3. 保存Fabric版本json
+            # 4. 保存Fabric版本json
             json_path = os.path.join(version_dir, f"{fabric_version_id}.json")
             with open(json_path, 'w', encoding='utf-8') as f:
                 json.dump(fabric_profile, f, indent=2, ensure_ascii=False)
             self.log(f"Fabric版本信息已保存: {json_path}")
 
-            # 4. 下载Fabric相关库文件
-            libraries_dir = os.path.join(self.minecraft_dir, 'libraries')
-            os.makedirs(libraries_dir, exist_ok=True)
-
-            mirror_url = self.get_mirror_url()
-
-            for lib in fabric_profile['libraries']:
-                if 'downloads' in lib and 'artifact' in lib['downloads']:
-                    lib_url = lib['downloads']['artifact']['url']
-
-                    # 尝试使用镜像源
-                    if "maven.fabricmc.net" in lib_url:
-                        mirror_lib_url = lib_url.replace(
-                            "https://maven.fabricmc.net",
-                            f"{mirror_url}/maven"
-                        )
-                        try:
-                            self.download_file(mirror_lib_url,
-                                               os.path.join(libraries_dir, lib['downloads']['artifact']['path']))
-                            continue
-                        except Exception as e:
-                            self.log(f"从镜像源下载失败，尝试原始URL: {lib_url}", "warning")
-
-                    # 使用原始URL
-                    try:
-                        self.download_file(lib_url, os.path.join(libraries_dir, lib['downloads']['artifact']['path']))
-                    except Exception as e:
-                        self.log(f"下载Fabric库失败: {lib_url} - {str(e)}", "error")
-                        continue
-
             self.log(f"Fabric {fabric_version['version']} 安装完成!", "success")
             messagebox.showinfo("成功", f"Fabric {fabric_version['version']} 安装完成!")
             self.refresh_local_versions()
@@ -1810,7 +4015,7 @@ class MinecraftBlueLauncher:
         mirror_url = self.get_mirror_url()
         forge_meta_url = f"{mirror_url}/forge/minecraft/{minecraft_version}"
 
-        response = requests.get(forge_meta_url, timeout=10)
+        response = self.http.get(forge_meta_url, timeout=self.http_timeout)
         response.raise_for_status()
 
         return response.json()
@@ -1900,47 +4105,67 @@ class MinecraftBlueLauncher:
                 f"{mirror_url}/maven"
             )
 
-            # 2. 下载Forge安装器
-            installer_path = os.path.join(self.minecraft_dir, 'forge_installer.jar')
-            self.log(f"下载Forge安装器: {forge_installer_url}")
-            self.download_file(forge_installer_url, installer_path)
+            # 2. 下载Forge安装器（按版本和SHA-1缓存，重复安装时直接复用）
+            forge_cache_dir = os.path.join(
+                self.cache_dir, 'forge', f"{base_version}-{forge_version['version']}"
+            )
+            installer_path = os.path.join(forge_cache_dir, 'installer.jar')
+            installer_sha1 = self.get_forge_installer_sha1(forge_version)
+            if installer_sha1 is None and os.path.exists(installer_path):
+                self.log(f"使用缓存的Forge安装器: {installer_path}")
+            else:
+                self.log(f"下载Forge安装器: {forge_installer_url}")
+                self.download_file(
+                    forge_installer_url,
+                    installer_path,
+                    installer_sha1,
+                    size=None if installer_sha1 else self.probe_remote_size(forge_installer_url)
+                )
 
-            # 3. 运行Forge安装器
-            self.log("运行Forge安装器...")
-            java_path = self.java_entry.get().strip()
+            # 3. 输入（安装器和原版客户端）未变化且产物完好时，跳过安装器的处理步骤
+            inputs_key = self.get_forge_inputs_key(installer_path, base_version)
+            record_path = os.path.join(forge_cache_dir, 'outputs.json')
+            if self.reuse_forge_outputs(record_path, inputs_key):
+                self.log("Forge安装产物未变化，跳过运行安装器", "success")
+            else:
+                # 4. 运行Forge安装器
+                self.log("运行Forge安装器...")
+                java_path = self.java_entry.get().strip()
 
-            cmd = [
-                java_path,
-                "-jar", installer_path,
-                "--installServer" if platform.system() == "Linux" else "--installClient",
-                "--mirror", mirror_url
-            ]
+                cmd = [
+                    java_path,
+                    "-jar", installer_path,
+                    "--installServer" if platform.system() == "Linux" else "--installClient",
+                    "--mirror", mirror_url
+                ]
 
-            process = subprocess.Popen(
-                cmd,
-                cwd=self.minecraft_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                encoding='utf-8',
-                errors='replace'
-            )
+                before = self.snapshot_files(['versions', 'libraries'])
+                process = subprocess.Popen(
+                    cmd,
+                    cwd=self.minecraft_dir,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    universal_newlines=True,
+                    encoding='utf-8',
+                    errors='replace'
+                )
 
-            # 读取安装器输出
-            while True:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                if output:
-                    self.log(output.strip())
+                # 读取安装器输出
+                while True:
+                    output = process.stdout.readline()
+                    if output == '' and process.poll() is not None:
+                        break
+                    if output:
+                        self.log(output.strip())
 
-            return_code = process.wait()
+                return_code = process.wait()
 
-            if return_code != 0:
-                raise Exception(f"Forge安装器返回错误代码: {return_code}")
+                if return_code != 0:
+                    raise Exception(f"Forge安装器返回错误代码: {return_code}")
 
-            # 4. 清理安装器
-            os.remove(installer_path)
+                # 记录安装器新生成或修改的文件，供下次复用
+                after = self.snapshot_files(['versions', 'libraries'])
+                self.save_forge_outputs(record_path, inputs_key, before, after)
 
             # 5. 检查安装结果
             forge_version_id = f"{base_version}-forge{forge_version['version']}"
@@ -1962,11 +4187,70 @@ class MinecraftBlueLauncher:
             self.set_status("就绪")
             self.toggle_buttons(True)
 
+    def get_forge_installer_sha1(self, forge_version):
+        """获取安装器SHA-1"""
+        for file_info in forge_version.get('files', []):
+            if file_info.get('category') == 'installer' and file_info.get('format') == 'jar':
+                return file_info.get('hash')
+        return None
+
+    def get_forge_inputs_key(self, installer_path, base_version):
+        """计算安装输入键"""
+        client_jar = os.path.join(self.minecraft_dir, 'versions', base_version, f"{base_version}.jar")
+        inputs = {
+            'installer': _sha1_file(installer_path),
+            'client': _sha1_file(client_jar) if os.path.exists(client_jar) else None
+        }
+        return hashlib.sha1(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def snapshot_files(self, subdirs):
+        """记录目录文件"""
+        snapshot = {}
+        for subdir in subdirs:
+            root_dir = os.path.join(self.minecraft_dir, subdir)
+            for dirpath, _, filenames in os.walk(root_dir):
+                for filename in filenames:
+                    full_path = os.path.join(dirpath, filename)
+                    try:
+                        stat = os.stat(full_path)
+                    except OSError:
+                        continue
+                    relative_path = os.path.relpath(full_path, self.minecraft_dir).replace(os.sep, '/')
+                    snapshot[relative_path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def save_forge_outputs(self, record_path, inputs_key, before, after):
+        """保存安装产物"""
+        outputs = {}
+        for relative_path, info in after.items():
+            if before.get(relative_path) == info or relative_path.endswith(('.part', '.tmp')):
+                continue
+            full_path = os.path.join(self.minecraft_dir, relative_path)
+            outputs[relative_path] = {'sha1': _sha1_file(full_path), 'size': info[0]}
+
+        self.write_json_atomic(record_path, {
+            'inputs_key': inputs_key,
+            'outputs': outputs
+        })
+        self.log(f"已记录Forge安装产物: {len(outputs)} 个文件")
+
+    def reuse_forge_outputs(self, record_path, inputs_key):
+        """复用安装产物"""
+        record = self.read_json_file(record_path)
+        if not record or record.get('inputs_key') != inputs_key or not record.get('outputs'):
+            return False
+
+        return all(
+            self.is_file_valid(os.path.join(self.minecraft_dir, relative_path), info['sha1'], info['size'])
+            for relative_path, info in record['outputs'].items()
+        )
+
     def toggle_buttons(self, enable):
         """切换按钮状态"""
         state = NORMAL if enable else DISABLED
         self.download_btn.config(state=state)
         self.launch_btn.config(state=state)
+        self.verify_btn.config(state=state)
         self.refresh_btn.config(state=state)
 
     def set_status(self, message):
@@ -1998,11 +4282,18 @@ class MinecraftBlueLauncher:
             if messagebox.askyesno("确认", "游戏正在运行，确定要退出吗？"):
                 self.running_process.terminate()
 
+        # 取消尚未开始的下载任务
+        self.download_executor.shutdown(wait=False, cancel_futures=True)
+        self.hedge_executor.shutdown(wait=False, cancel_futures=True)
+        self.http.close()
+
         self.save_config()
         self.root.destroy()
 
 
 if __name__ == "__main__":
+    # 打包为可执行文件后，深度校验使用的进程池需要此调用
+    multiprocessing.freeze_support()
     root = Tk()
     launcher = MinecraftBlueLauncher(root)
     root.protocol("WM_DELETE_WINDOW", launcher.on_closing)